@@ -1,12 +1,22 @@
+import copy
+import hashlib
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
 
+from data_handler.sketches import RunningMoments, QuantileSketch, SpaceSaving, HyperLogLog
+from load_data.load_data_package import recommend_dtype
+
 class Analysis_Strategy_Base(ABC):
     '''
     base class for all the data frame analysis method
+    Strategies with returns_result = False only print their analysis, DataInspector does not cache them
     '''
 
+    returns_result = True
+
     @abstractmethod
     def inspect_data(self, df: pd.DataFrame):
         '''
@@ -22,6 +32,9 @@ class DataTypeStrategy(Analysis_Strategy_Base):
     '''
     Stategy used to analyze the data frame data type
     '''
+
+    returns_result = False
+
     def inspect_data(self, df: pd.DataFrame):
         print("Starting Analyzing the data type and null value information")
         print(df.info())
@@ -57,6 +70,8 @@ class SummaryStatisticStrategy(Analysis_Strategy_Base):
     Class for getting the columns summary statistics
     '''
 
+    returns_result = False
+
     def inspect_data(self, df: pd.DataFrame):
         '''
         Main function for the current strategy
@@ -72,16 +87,444 @@ class SummaryStatisticStrategy(Analysis_Strategy_Base):
         print(df.describe(include=['O']))
 
 
+class DataProfile():
+    '''
+    Structured result of ProfileStrategy: one row per column with its dtype, kind, counts,
+    top value, moments and quantiles
+    '''
+
+    STATISTICS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+    def __init__(self, rows: int, columns: pd.DataFrame) -> None:
+        '''
+        :param rows (int): number of rows of the profiled data frame
+        :param columns (pd.DataFrame): per column profile indexed by the column names
+        '''
+        self.rows = rows
+        self.columns = columns
+
+    def __repr__(self) -> str:
+        return f'DataProfile(rows={self.rows}, columns={len(self.columns)})\n{self.columns}'
+
+    def numeric_columns(self) -> list:
+        '''
+        :return (list): List of numeric columns, like DataTypeStrategy.get_numeric_columns()
+        '''
+        return self.columns.index[self.columns['kind'] == 'numeric'].to_list()
+
+    def categorical_columns(self) -> list:
+        '''
+        :return (list): List of categorical columns, like DataTypeStrategy.get_categorical_columns()
+        '''
+        return self.columns.index[self.columns['kind'] == 'categorical'].to_list()
+
+    def describe(self, include: str = 'numeric') -> pd.DataFrame:
+        '''
+        Summary in the shape of df.describe()
+
+        :param include (str): 'numeric' for the numeric columns, 'categorical' for the object columns
+
+        :return (pd.DataFrame): statistics as rows and columns as columns
+        '''
+        if include == 'numeric':
+            return self.columns.loc[self.numeric_columns(), DataProfile.STATISTICS].T.astype(float)
+        if include == 'categorical':
+            summary = self.columns.loc[self.categorical_columns(), ['count', 'distinct', 'top', 'freq']]
+            return summary.rename(columns={'distinct': 'unique'}).T
+        raise ValueError("include should be 'numeric' or 'categorical'")
+
+
+class ProfileStrategy(Analysis_Strategy_Base):
+    '''
+    Strategy profiling every column in one pass: the column is factorized once, and the null count,
+    distinct count, top value, moments, min, max and quantiles are all derived from the distinct values
+    and their counts, so nothing is printed and the frame is scanned once
+    '''
+
+    QUANTILES = [0.25, 0.5, 0.75]
+
+    @staticmethod
+    def _kind(series: pd.Series) -> str:
+        if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+            return 'categorical' if series.dtype == object else 'other'
+        return 'numeric'
+
+    @staticmethod
+    def profile_column(series: pd.Series) -> dict:
+        '''
+        Profile a single column from one factorize pass
+
+        :param series (pd.Series): target column
+
+        :return (dict): profile of the column
+        '''
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        present = codes >= 0
+        counts = np.bincount(codes[present], minlength=len(uniques))
+        count = int(counts.sum())
+        kind = ProfileStrategy._kind(series)
+
+        profile = {'dtype': str(series.dtype), 'kind': kind, 'count': count, 'missing': len(series) - count,
+                   'distinct': len(uniques), 'top': np.nan, 'freq': np.nan}
+        profile.update(dict.fromkeys(DataProfile.STATISTICS[1:], np.nan))
+        if count == 0:
+            return profile
+
+        top = int(np.argmax(counts))
+        profile['top'] = uniques[top].item() if isinstance(uniques[top], np.generic) else uniques[top]
+        profile['freq'] = int(counts[top])
+
+        if kind == 'numeric':
+            values = np.asarray(uniques, dtype=float)
+            order = np.argsort(values, kind='stable')
+            values, counts = values[order], counts[order]
+            mean = (values * counts).sum() / count
+            profile['mean'] = mean
+            profile['std'] = np.sqrt((counts * (values - mean) ** 2).sum() / (count - 1)) if count > 1 else np.nan
+            profile['min'], profile['max'] = values[0], values[-1]
+
+            # exact linear interpolated quantiles, the order statistics are read off the cumulative counts
+            cumulative = np.cumsum(counts)
+            for q in ProfileStrategy.QUANTILES:
+                position = q * (count - 1)
+                lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+                upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+                profile[f'{q:.0%}'] = lower + (position - np.floor(position)) * (upper - lower)
+        return profile
+
+    def inspect_data(self, df: pd.DataFrame) -> DataProfile:
+        '''
+        Main function for the current strategy
+
+        :param df (pd.DataFrame) : target dataframe
+
+        :return (DataProfile): structured profile of every column
+        '''
+        profiles = [ProfileStrategy.profile_column(df.iloc[:, position]) for position in range(df.shape[1])]
+        columns = pd.DataFrame(profiles, index=df.columns)
+        return DataProfile(len(df), columns)
+
+
+class StreamingSummaryStrategy(Analysis_Strategy_Base):
+    '''
+    Summary statistics over a stream of batches, for data larger than memory. Every column keeps mergeable
+    accumulators: exact moments, min and max, a KLL-style quantile sketch and a HyperLogLog distinct count
+    for numeric columns, a heavy hitter summary and a HyperLogLog for object columns. Strategies fitted by
+    parallel workers are combined with merge(), and summary() gives the shape of df.describe()
+    '''
+
+    def __init__(self, sketch_size: int = 200, precision: int = 12, top_capacity: int = 1000) -> None:
+        '''
+        :param sketch_size (int): size of the quantile sketches, larger is more accurate
+        :param precision (int): register bits of the HyperLogLog distinct counts
+        :param top_capacity (int): number of values tracked for the top value of object columns
+        '''
+        self.sketch_size = sketch_size
+        self.precision = precision
+        self.top_capacity = top_capacity
+        self.accumulators_ = {}
+
+    def _new_accumulators(self, series: pd.Series) -> dict:
+        '''
+        Accumulators of a column, picked from its first batch holding a value. A batch of nulls only says
+        nothing about the column (pandas reads it as float), so the kind stays 'pending' until values arrive
+
+        :param series (pd.Series): batch of the column
+
+        :return (dict): kind, rows and accumulators of the column
+        '''
+        numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        if not series.notna().any():
+            return {'kind': 'pending', 'rows': 0, 'numeric': numeric}
+        if numeric:
+            return {'kind': 'numeric', 'rows': 0, 'moments': RunningMoments(),
+                    'quantiles': QuantileSketch(k=self.sketch_size), 'distinct': HyperLogLog(self.precision)}
+        if series.dtype == object:
+            return {'kind': 'categorical', 'rows': 0, 'top': SpaceSaving(self.top_capacity),
+                    'distinct': HyperLogLog(self.precision)}
+        return {'kind': 'other', 'rows': 0}
+
+    def partial_fit(self, df: pd.DataFrame) -> 'StreamingSummaryStrategy':
+        '''
+        Add one batch to the accumulators
+
+        :param df (pd.DataFrame) : batch of the target data
+
+        :return (StreamingSummaryStrategy): self
+        '''
+        for column in df.columns:
+            series = df[column]
+            accumulators = self.accumulators_.setdefault(column, self._new_accumulators(series))
+            if accumulators['kind'] == 'pending' and series.notna().any():
+                rows = accumulators['rows']
+                accumulators = self.accumulators_[column] = self._new_accumulators(series)
+                accumulators['rows'] = rows
+            accumulators['rows'] += len(series)
+            if accumulators['kind'] == 'numeric':
+                values = series.to_numpy(dtype=float, na_value=np.nan)
+                accumulators['moments'].update(values)
+                accumulators['quantiles'].update(values)
+                accumulators['distinct'].update(values)
+            elif accumulators['kind'] == 'categorical':
+                accumulators['top'].update(series)
+                accumulators['distinct'].update(series)
+        return self
+
+    def merge(self, other: 'StreamingSummaryStrategy') -> 'StreamingSummaryStrategy':
+        '''
+        Combine the accumulators of a strategy fitted on other batches, e.g. by another worker
+
+        :param other (StreamingSummaryStrategy): strategy with the same settings
+
+        :return (StreamingSummaryStrategy): self
+        '''
+        for column, accumulators in other.accumulators_.items():
+            if column not in self.accumulators_:
+                self.accumulators_[column] = copy.deepcopy(accumulators)
+                continue
+            own = self.accumulators_[column]
+            if accumulators['kind'] == 'pending':
+                own['rows'] += accumulators['rows']
+                continue
+            if own['kind'] == 'pending':
+                rows = own['rows']
+                own = self.accumulators_[column] = copy.deepcopy(accumulators)
+                own['rows'] += rows
+                continue
+            if own['kind'] != accumulators['kind']:
+                raise ValueError(f"Column {column} has different kinds in the merged summaries")
+            own['rows'] += accumulators['rows']
+            for name in ('moments', 'quantiles', 'top', 'distinct'):
+                if name in own:
+                    own[name].merge(accumulators[name])
+        return self
+
+    def summary(self, include: str = 'numeric') -> pd.DataFrame:
+        '''
+        Summary in the shape of df.describe()
+
+        :param include (str): 'numeric' for the numeric columns, 'categorical' for the object columns
+
+        :return (pd.DataFrame): statistics as rows and columns as columns
+        '''
+        if include == 'numeric':
+            summary = {}
+            for column, accumulators in self.accumulators_.items():
+                if accumulators['kind'] == 'pending' and accumulators['numeric']:
+                    # only nulls were seen, like describe() of an all missing float column
+                    summary[column] = [0.0] + [np.nan] * (len(DataProfile.STATISTICS) - 1)
+                    continue
+                if accumulators['kind'] != 'numeric':
+                    continue
+                moments = accumulators['moments']
+                quartiles = accumulators['quantiles'].quantiles([0.25, 0.5, 0.75])
+                summary[column] = [float(moments.count), moments.mean if moments.count else np.nan, moments.std(),
+                                   moments.min, *quartiles, moments.max]
+            return pd.DataFrame(summary, index=DataProfile.STATISTICS, dtype=float)
+
+        if include == 'categorical':
+            summary = {}
+            for column, accumulators in self.accumulators_.items():
+                if accumulators['kind'] == 'pending' and not accumulators['numeric']:
+                    summary[column] = [0, 0, np.nan, np.nan]
+                    continue
+                if accumulators['kind'] != 'categorical':
+                    continue
+                top = accumulators['top'].top(1)
+                summary[column] = [accumulators['top'].total, accumulators['distinct'].count(),
+                                   top.index[0] if len(top) else np.nan, int(top.iloc[0]) if len(top) else np.nan]
+            return pd.DataFrame(summary, index=['count', 'unique', 'top', 'freq'], dtype=object)
+
+        raise ValueError("include should be 'numeric' or 'categorical'")
+
+    def distinct_counts(self) -> pd.Series:
+        '''
+        :return (pd.Series): estimated number of distinct values of the numeric and object columns
+        '''
+        return pd.Series({column: accumulators['distinct'].count() for column, accumulators in self.accumulators_.items()
+                          if 'distinct' in accumulators}, dtype=int)
+
+    def inspect_data(self, df) -> dict:
+        '''
+        Main function for the current strategy, the accumulators are rebuilt from the given data
+
+        :param df (pd.DataFrame | Iterable[pd.DataFrame]) : target dataframe, or its batches e.g. from
+                                                           Data_Loader_Handler.iter_batches()
+
+        :return (dict): describe() shaped summaries of the numeric and categorical columns
+        '''
+        self.accumulators_ = {}
+        for batch in ([df] if isinstance(df, pd.DataFrame) else df):
+            self.partial_fit(batch)
+        return {'numeric': self.summary('numeric'), 'categorical': self.summary('categorical')}
+
+
+class MemoryFootprintStrategy(Analysis_Strategy_Base):
+    '''
+    Strategy reporting the exact deep memory usage of every column and what it would take
+    as category, with the narrowest lossless numeric dtype (recommend_dtype() of load_data) and
+    as a sparse column whose fill value is the most frequent value
+    '''
+
+    def __init__(self, category_ratio: float = 0.5) -> None:
+        '''
+        :param category_ratio (float): maximum share of distinct values for a text column to become category
+        '''
+        self.category_ratio = category_ratio
+
+    @staticmethod
+    def _dtype_bytes(rows: int, dtype: str) -> int:
+        '''
+        Memory of a numeric column of the given dtype, nullable dtypes add one mask byte per row
+
+        :param rows (int): number of rows
+        :param dtype (str): numeric dtype
+
+        :return (int): number of bytes
+        '''
+        dtype = pd.api.types.pandas_dtype(dtype)
+        if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            return rows * (dtype.numpy_dtype.itemsize + 1)
+        return rows * dtype.itemsize
+
+    def footprint_column(self, series: pd.Series) -> dict:
+        '''
+        Memory footprint of a single column
+
+        :param series (pd.Series): target column
+
+        :return (dict): current bytes, bytes of the alternatives and the recommended dtype
+        '''
+        current = int(series.memory_usage(deep=True, index=False))
+        recommended = recommend_dtype(series, self.category_ratio)
+        footprint = {'dtype': str(series.dtype), 'bytes': current, 'recommended': recommended,
+                     'category_bytes': np.nan, 'numeric_bytes': np.nan, 'sparse_bytes': np.nan}
+
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            footprint['category_bytes'] = int(series.astype('category').memory_usage(deep=True, index=False))
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            footprint['numeric_bytes'] = MemoryFootprintStrategy._dtype_bytes(len(series), recommended)
+
+        if (pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.api.extensions.ExtensionDtype)
+                and len(series)):
+            # sparse keeps the values that differ from the fill value plus their int32 positions
+            fill_count = int(series.value_counts(dropna=False).iloc[0])
+            footprint['sparse_bytes'] = (len(series) - fill_count) * (series.dtype.itemsize + 4)
+        return footprint
+
+    def inspect_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Main function for the current strategy
+
+        :param df (pd.DataFrame) : target dataframe
+
+        :return (pd.DataFrame): per column footprint with the savings of every alternative, largest savings first
+        '''
+        report = pd.DataFrame([self.footprint_column(df.iloc[:, position]) for position in range(df.shape[1])],
+                              index=df.columns)
+        for name in ('category', 'numeric', 'sparse'):
+            report[f'{name}_savings'] = report['bytes'] - report[f'{name}_bytes']
+        savings = report[['category_savings', 'numeric_savings', 'sparse_savings']]
+        report['best_savings'] = savings.clip(lower=0).max(axis=1).fillna(0)
+        return report.sort_values('best_savings', ascending=False, kind='stable')
+
+
+def frame_fingerprint(df: pd.DataFrame, full: bool = False, blocks: int = 8, block_rows: int = 32) -> str:
+    '''
+    Fingerprint of a data frame: shape, column names, dtypes and the hashes of a fixed sample of row blocks
+    (evenly spaced, always including the first and the last rows), so the cost does not grow with the frame.
+    Edits outside the sampled blocks are not seen, full = True hashes every row at the cost of a full pass
+
+    :param df (pd.DataFrame) : target data frame
+    :param full (bool) : hash every row instead of the sampled blocks
+    :param blocks (int) : number of sampled row blocks
+    :param block_rows (int) : rows in every sampled block
+
+    :return (str): hex digest of the fingerprint
+    '''
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((df.shape, df.columns.to_list(), [str(dtype) for dtype in df.dtypes])).encode())
+    if full or len(df) <= blocks * block_rows:
+        sample = df
+    else:
+        starts = np.unique(np.linspace(0, len(df) - block_rows, blocks).astype(np.intp))
+        sample = df.take((starts[:, None] + np.arange(block_rows)).ravel())
+    try:
+        digest.update(pd.util.hash_pandas_object(sample, index=True).to_numpy().tobytes())
+    except TypeError:
+        # unhashable cells, e.g. lists, fall back to their text
+        digest.update(sample.to_csv().encode())
+    return digest.hexdigest()
+
+
 class DataInspector():
     '''
     Collection class that unified all the data analysis strategy for ease of usage
     '''
-    def __init__(self, strategy: Analysis_Strategy_Base = DataTypeStrategy()) -> None:
+    def __init__(self, strategy: Analysis_Strategy_Base = DataTypeStrategy(), cache_size: int = 32,
+                 full_fingerprint: bool = False) -> None:
         '''
         Initialize the DataInspector with the default strategy DataTypeStrategy
         :param strategy (Analysis_Strategy_Base): Strategy wants to use to analyze the data
+        :param cache_size (int): number of results kept for unchanged frames, 0 turns the cache off
+        :param full_fingerprint (bool): key the cache on the hashes of every row, by default frame_fingerprint()
+                                        samples row blocks and an edit outside them returns the stale result
         '''
         self._strategy = strategy
+        self.cache_size = cache_size
+        self.full_fingerprint = full_fingerprint
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _describe_strategy(strategy: Analysis_Strategy_Base) -> str:
+        '''
+        Describe the strategy class and its settings, fitted state (trailing underscore) is left out
+
+        :param strategy (Analysis_Strategy_Base): Strategy used for the analysis
+
+        :return (str): description of the strategy
+        '''
+        settings = {name: value for name, value in vars(strategy).items()
+                    if not name.startswith('_') and not name.endswith('_')}
+        return f'{type(strategy).__name__}{sorted(settings.items(), key=lambda item: item[0])}'
+
+    def _cached(self, operation: str, df, compute):
+        '''
+        Return the cached result of an operation on an unchanged frame, or compute and cache it.
+        Results that are None (printing strategies) and non DataFrame inputs are never cached
+
+        :param operation (str): name of the operation and its settings
+        :param df (pd.DataFrame): Data to be analyzed
+        :param compute: callable computing the result
+
+        :return: result of the operation
+        '''
+        if not self.cache_size or not isinstance(df, pd.DataFrame):
+            return compute()
+
+        key = (operation, frame_fingerprint(df, self.full_fingerprint))
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        self.misses += 1
+        result = compute()
+        if result is not None:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def clear_cache(self) -> None:
+        '''
+        Drop every cached result
+
+        :return: None
+        '''
+        self._cache.clear()
 
     def set_strategy(self, strategy = Analysis_Strategy_Base) -> None:
         '''
@@ -94,15 +537,28 @@ class DataInspector():
 
         self._strategy = strategy
 
-    def analyze(self, df: pd.DataFrame) -> None:
+    def analyze(self, df: pd.DataFrame):
         '''
         Perform the analysis based on the defined strategy
 
         :param df (pd.DataFrame) : Data to be analyzed
 
-        :return: Strategy analysis results
+        :return: Strategy analysis results, cached for unchanged frames, so do not modify them in place
+        '''
+        strategy = self._strategy
+        if not strategy.returns_result:
+            return strategy.inspect_data(df)
+        return self._cached(DataInspector._describe_strategy(strategy), df, lambda: strategy.inspect_data(df))
+
+    def profile(self, df: pd.DataFrame) -> DataProfile:
+        '''
+        Profile every column in one pass with ProfileStrategy, the current strategy is kept
+
+        :param df (pd.DataFrame) : Data to be analyzed
+
+        :return: DataProfile of the data frame, cached for unchanged frames
         '''
-        self._strategy.inspect_data(df)
+        return self._cached('profile', df, lambda: ProfileStrategy().inspect_data(df))
 
     def get_columns(self, df: pd.DataFrame) -> dict:
         '''
@@ -113,11 +569,12 @@ class DataInspector():
 
         :return: dictionary containing numeric columns and categorical columns
         '''
-        if self._strategy != DataTypeStrategy():
+        if not isinstance(self._strategy, DataTypeStrategy):
             self._strategy = DataTypeStrategy()
 
+        strategy = self._strategy
         try:
-            return {'numeric': self._strategy.get_numeric_columns(df),
-                    'categorical': self._strategy.get_categorical_columns(df)}
+            # not cached: selecting the dtypes is cheaper than the fingerprint keying it
+            return {'numeric': strategy.get_numeric_columns(df), 'categorical': strategy.get_categorical_columns(df)}
         except Exception as e:
             raise IOError("Failed to extract different types of columns")
\ No newline at end of file
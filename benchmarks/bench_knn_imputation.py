@@ -0,0 +1,59 @@
+'''
+Benchmark of KNN_Strategy against the existing fill methods.
+
+Run from the repository root:
+    python -m benchmarks.bench_knn_imputation
+'''
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_handler.missing_value_fix import Fill_Strategy, KNN_Strategy
+
+
+def make_frame(rows: int, columns: int = 10, missing: float = 0.05, seed: int = 0) -> pd.DataFrame:
+    '''
+    Build a numeric frame with a share of missing values
+    :param rows (int): number of rows
+    :param columns (int): number of columns
+    :param missing (float): share of missing values
+    :param seed (int): random seed
+    :return (pd.DataFrame): frame with missing values
+    '''
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(rows, columns))
+    values[rng.random(values.shape) < missing] = np.nan
+    return pd.DataFrame(values, columns=[f'x{i}' for i in range(columns)])
+
+
+def timed(strategy, df: pd.DataFrame) -> float:
+    '''
+    Time one handle() call, the progress messages of the strategies are silenced
+    :param strategy: missing value strategy
+    :param df (pd.DataFrame): frame to fill
+    :return (float): seconds
+    '''
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        strategy.handle(df)
+        return time.perf_counter() - start
+
+
+def main():
+    strategies = {'mean': Fill_Strategy('mean'),
+                  'median': Fill_Strategy('median'),
+                  'knn': KNN_Strategy(),
+                  'knn 4 threads': KNN_Strategy(workers=4),
+                  'knn 5k donors': KNN_Strategy(max_donors=5_000)}
+    print(f"{'rows':>8} " + ' '.join(f'{name:>14}' for name in strategies))
+    for rows in (1_000, 10_000, 50_000):
+        df = make_frame(rows)
+        timings = [timed(strategy, df) for strategy in strategies.values()]
+        print(f'{rows:>8} ' + ' '.join(f'{seconds:>13.3f}s' for seconds in timings))
+
+
+if __name__ == '__main__':
+    main()
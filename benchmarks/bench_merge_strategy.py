@@ -0,0 +1,50 @@
+'''
+Benchmark of the vectorized MergeStrategy against the previous element-wise mapping.
+
+Run from the repository root:
+    python -m benchmarks.bench_merge_strategy
+'''
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_handler.merge_low_frequency import MergeStrategy
+
+
+def make_column(rows: int, categories: int = 200, seed: int = 0) -> pd.Series:
+    '''
+    Build a skewed categorical column where most categories are rare
+    :param rows (int): number of rows
+    :param categories (int): number of distinct values
+    :param seed (int): random seed
+    :return (pd.Series): object column
+    '''
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, categories + 1) ** 1.5
+    values = rng.choice(categories, size=rows, p=weights / weights.sum())
+    return pd.Series(np.array([f'cat_{i}' for i in range(categories)], dtype=object)[values])
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'rows':>10} {'map':>10} {'isin':>10} {'codes':>10} {'speedup':>10}")
+    for rows in (100_000, 1_000_000, 5_000_000):
+        column = make_column(rows)
+        categorical = column.astype('category')
+        rare = list(MergeStrategy.check(column.to_frame('x'), ['x'])['x'])
+        mapping = {value: 'SMALL_GROUP' for value in rare}
+
+        mapped = timed(lambda: column.map(lambda x: mapping.get(x, x)))
+        replaced = timed(lambda: MergeStrategy.merge_column(column, rare))
+        recoded = timed(lambda: MergeStrategy.merge_column(categorical, rare))
+        print(f'{rows:>10} {mapped:>9.3f}s {replaced:>9.3f}s {recoded:>9.3f}s {mapped / replaced:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
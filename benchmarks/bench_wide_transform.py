@@ -0,0 +1,59 @@
+'''
+Benchmark of the column block thread pool of LogTransformation and Fill_Strategy on a wide frame.
+
+The column kernels release the GIL, so the speedup follows the number of free cores; on a single
+core machine the workers only add the small overhead of the pool.
+
+Run from the repository root:
+    python -m benchmarks.bench_wide_transform
+'''
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_handler.data_transformation import LogTransformation
+from data_handler.missing_value_fix import Fill_Strategy
+
+
+def make_frame(rows: int, columns: int, missing: float = 0.1, seed: int = 0) -> pd.DataFrame:
+    '''
+    Build a wide numeric frame with missing values in every column
+    :param rows (int): number of rows
+    :param columns (int): number of columns
+    :param missing (float): share of missing values
+    :param seed (int): random seed
+    :return (pd.DataFrame): numeric frame
+    '''
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(size=(rows, columns))
+    values[rng.random((rows, columns)) < missing] = np.nan
+    return pd.DataFrame(values, columns=[f'col_{i}' for i in range(columns)])
+
+
+def timed(function, repeat: int = 3) -> float:
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    df = make_frame(100_000, 300)
+    features = df.columns.to_list()
+    print(f"cores: {os.cpu_count()}, frame: {df.shape}")
+    print(f"{'workers':>8} {'log':>10} {'fill median':>12}")
+    baseline = None
+    for workers in (None, 2, 4, 8):
+        log_seconds = timed(lambda: LogTransformation(features, workers=workers).transform(df))
+        fill_seconds = timed(lambda: Fill_Strategy('median', workers=workers).handle(df))
+        baseline = baseline or (log_seconds, fill_seconds)
+        print(f"{str(workers):>8} {log_seconds:>10.3f} {fill_seconds:>12.3f}"
+              f"   speedup {baseline[0] / log_seconds:.2f}x / {baseline[1] / fill_seconds:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
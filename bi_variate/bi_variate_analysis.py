@@ -1,8 +1,6 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
-import seaborn as sns
 
 class Bi_Variate_Base(ABC):
     '''
@@ -37,6 +35,9 @@ class NumericvsNumericStrategy(Bi_Variate_Base):
 
         '''
         print(f"Analyzing feature {feature1} vs {feature2}")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.figure(figsize= (10,6))
         sns.scatterplot(x = feature1, y = feature2, data = df)
         plt.title(f'{feature1} vs {feature2}')
@@ -60,6 +61,9 @@ class NumericvsCategoricalStrategy(Bi_Variate_Base):
 
         '''
         print(f"Analyzing feature {feature1} vs {feature2}")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.figure(figsize=(10,6))
         sns.boxplot(x=feature1, y = feature2, data = df)
         plt.title(f'{feature1} vs {feature2}')
@@ -1,13 +1,35 @@
-import matplotlib.pyplot as plt
+import json
+from statistics import NormalDist
+
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+
+from data_handler.parallel import map_column_blocks
+from load_data.load_data_package import recommend_dtype, apply_schema
+from data_handler.sketches import QuantileSketch
 
 class FeatureEngineeringBase(ABC):
     '''
-    Base class for different feature engineering strategy
+    Base class for different feature engineering strategy.
+    With inplace = True the strategies modify the given DataFrame, otherwise they work on a
+    shallow copy and only the transformed columns are replaced.
+    Strategies with column_local = True transform every column on its own and implement
+    target_columns() and transform_column(), so a Pipeline can fuse them into one pass per column
     '''
 
+    inplace = False
+    column_local = False
+
+    def _output_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Frame the strategy writes its result columns into
+        :param df (pd.DataFrame) : Target Data Frame
+        :return: (pd.DataFrame) df itself in inplace mode, a shallow copy sharing the column data otherwise
+        '''
+        return df if self.inplace else df.copy(deep=False)
+
     @abstractmethod
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         '''
@@ -17,17 +39,32 @@ class FeatureEngineeringBase(ABC):
         '''
         pass
 
+    def transform_batches(self, batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        '''
+        Perform the transformation on a stream of data frames, one batch at a time
+        :param batches (Iterable[pd.DataFrame]) : Target Data Frames, e.g. from Data_Loader_Handler.iter_batches()
+        :return: (Iterator[pd.DataFrame]) Transformed Data Frames
+        '''
+        for batch in batches:
+            yield self.transform(batch)
+
 class LogTransformation(FeatureEngineeringBase):
     '''
     Perform Log Transformation for those skewed columns to make them more normal
     '''
 
-    def __init__(self, features: list):
+    column_local = True
+
+    def __init__(self, features: list, inplace: bool = False, workers: int = None):
         '''
         Initial those features to be changed
         :param features (list[str]): List of column names
+        :param inplace (bool): Transform the given Data Frame instead of returning a new one
+        :param workers (int): Number of threads transforming blocks of columns, None transforms them in turn
         '''
         self.features = features
+        self.inplace = inplace
+        self.workers = workers
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         '''
@@ -36,12 +73,438 @@ class LogTransformation(FeatureEngineeringBase):
         :return: (pd.DataFrame) Transformed Data Frame
         '''
         try:
-            new_df = df.copy()
+            new_df = self._output_frame(df)
             print("Log Transformation starts............")
-            for feature in self.features:
-                new_df[feature] = np.log1p(new_df[feature])
-                # log1p is log(1+x) to avoid log(0)
+            # log1p is log(1+x) to avoid log(0)
+            transformed = map_column_blocks(lambda block: [np.log1p(new_df[feature]) for feature in block],
+                                            self.features, self.workers)
+            for feature, values in zip(self.features, transformed):
+                new_df[feature] = values
             print("Log Transformation finished")
             return new_df
         except Exception as e:
-            raise IOError(f"Log transformation failed becuase of {e}")
\ No newline at end of file
+            raise IOError(f"Log transformation failed becuase of {e}")
+
+    def target_columns(self, df: pd.DataFrame, feature: list = None) -> list:
+        '''
+        Columns changed by the strategy
+        :param df (pd.DataFrame) : Target Data Frame
+        :param feature (list[str]) : Not used, the features are given to the constructor
+        :return: (list[str]) column names
+        '''
+        return list(self.features)
+
+    def transform_column(self, series: pd.Series) -> pd.Series:
+        '''
+        Log transform a single column
+        :param series (pd.Series) : Target column
+        :return: (pd.Series) Transformed column
+        '''
+        return np.log1p(series)
+
+
+class DowncastTransformation(FeatureEngineeringBase):
+    '''
+    Shrink a Data Frame by casting every column to the compact dtype of recommend_dtype():
+    low cardinality text to category and numbers to the narrowest lossless width.
+    Columns with missing values stay float, so the missing value strategies can still fill them.
+    After fit() the learnt dtypes are applied to later batches, values that do not fit are widened
+    '''
+
+    column_local = True
+
+    def __init__(self, features: list = None, category_ratio: float = 0.5, inplace: bool = False):
+        '''
+        :param features (list[str]): List of column names, defaults to every column
+        :param category_ratio (float): maximum share of distinct values for a text column to become category
+        :param inplace (bool): Cast the given Data Frame instead of returning a new one
+        '''
+        self.features = features
+        self.category_ratio = category_ratio
+        self.inplace = inplace
+        self.schema_ = None
+
+    def fit(self, df: pd.DataFrame) -> 'DowncastTransformation':
+        '''
+        Learn the compact dtype of every feature
+        :param df (pd.DataFrame) : Training Data Frame
+        :return: (DowncastTransformation) the fitted transformation
+        '''
+        self.schema_ = {feature: recommend_dtype(df[feature], self.category_ratio)
+                        for feature in self.target_columns(df)}
+        return self
+
+    def target_columns(self, df: pd.DataFrame, feature: list = None) -> list:
+        '''
+        Columns changed by the strategy
+        :param df (pd.DataFrame) : Target Data Frame
+        :param feature (list[str]) : Not used, the features are given to the constructor
+        :return: (list[str]) column names
+        '''
+        if self.schema_ is not None:
+            return [feature for feature in self.schema_ if feature in df.columns]
+        return list(self.features) if self.features else df.columns.to_list()
+
+    def transform_column(self, series: pd.Series) -> pd.Series:
+        '''
+        Cast a single column to the learnt dtype, or to its own recommended dtype when not fitted
+        :param series (pd.Series) : Target column
+        :return: (pd.Series) Cast column
+        '''
+        if self.schema_ is not None:
+            if series.name not in self.schema_:
+                return series
+            return apply_schema(series.to_frame(), {series.name: self.schema_[series.name]}, self.category_ratio)[series.name]
+        dtype = recommend_dtype(series, self.category_ratio)
+        return series if str(series.dtype) == dtype else series.astype(dtype)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Cast every feature in one pass over the columns
+        :param df (pd.DataFrame) : Target Data Frame for transformation
+        :return: (pd.DataFrame) Downcast Data Frame
+        '''
+        try:
+            new_df = self._output_frame(df)
+            print("Downcast starts............")
+            before = new_df.memory_usage(deep=True).sum()
+            for feature in self.target_columns(new_df):
+                series = new_df[feature]
+                cast = self.transform_column(series)
+                if cast is not series:
+                    new_df[feature] = cast
+            print(f"Downcast finished, {before / 1024 ** 2:.1f} MB -> {new_df.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB")
+            return new_df
+        except Exception as e:
+            raise IOError(f"Downcast failed becuase of {e}")
+
+
+class FittedTransformation(FeatureEngineeringBase):
+    '''
+    Base class for transformations whose parameters are learnt from the data.
+    The parameters are estimated once with fit(), or chunk by chunk with partial_fit(), kept in
+    parameters_ and applied by transform() to later batches without refitting
+    '''
+
+    column_local = True
+
+    def __init__(self, features: list, inplace: bool = False):
+        '''
+        :param features (list[str]): List of column names
+        :param inplace (bool): Transform the given Data Frame instead of returning a new one
+        '''
+        self.features = features
+        self.inplace = inplace
+        self.parameters_ = None
+        self._accumulators = None
+
+    @abstractmethod
+    def _new_accumulator(self):
+        '''
+        :return: empty streaming accumulator of one feature
+        '''
+        pass
+
+    @abstractmethod
+    def _update_accumulator(self, accumulator, values: np.ndarray):
+        '''
+        :param accumulator: accumulator from _new_accumulator()
+        :param values (np.ndarray): non missing values of one chunk
+        :return: updated accumulator
+        '''
+        pass
+
+    @abstractmethod
+    def _parameters_from(self, accumulator) -> dict:
+        '''
+        :param accumulator: accumulator from _new_accumulator()
+        :return: (dict) json serializable parameters of one feature
+        '''
+        pass
+
+    @abstractmethod
+    def _apply(self, values: np.ndarray, parameters: dict) -> np.ndarray:
+        '''
+        :param values (np.ndarray): values of one feature
+        :param parameters (dict): parameters of the feature
+        :return: (np.ndarray) transformed values
+        '''
+        pass
+
+    def _settings(self) -> dict:
+        '''
+        :return: (dict) constructor arguments other than the features, stored with the parameters
+        '''
+        return {}
+
+    def fit(self, df: pd.DataFrame) -> 'FittedTransformation':
+        '''
+        Estimate the parameters of every feature
+        :param df (pd.DataFrame) : Training Data Frame
+        :return: (FittedTransformation) the fitted transformation
+        '''
+        self._accumulators = None
+        return self.partial_fit(df)
+
+    def partial_fit(self, df: pd.DataFrame) -> 'FittedTransformation':
+        '''
+        Update the parameters with one more chunk, so data larger than memory can be fitted chunk by chunk
+        :param df (pd.DataFrame) : Training chunk
+        :return: (FittedTransformation) the fitted transformation
+        '''
+        if self._accumulators is None:
+            self._accumulators = {feature: self._new_accumulator() for feature in self.features}
+
+        for feature in self.features:
+            values = df[feature].to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            if len(values):
+                self._accumulators[feature] = self._update_accumulator(self._accumulators[feature], values)
+
+        self.parameters_ = {feature: self._parameters_from(accumulator)
+                            for feature, accumulator in self._accumulators.items()}
+        return self
+
+    def target_columns(self, df: pd.DataFrame, feature: list = None) -> list:
+        '''
+        Columns changed by the strategy
+        :param df (pd.DataFrame) : Target Data Frame
+        :param feature (list[str]) : Not used, the features are given to the constructor
+        :return: (list[str]) column names
+        '''
+        return list(self.features)
+
+    def transform_column(self, series: pd.Series) -> pd.Series:
+        '''
+        Apply the fitted parameters to a single column, missing values stay missing
+        :param series (pd.Series) : Target column
+        :return: (pd.Series) Transformed column
+        '''
+        if self.parameters_ is None:
+            raise ValueError(f"{type(self).__name__} is not fitted, please call .fit() first")
+        values = series.to_numpy(dtype=float)
+        return pd.Series(self._apply(values, self.parameters_[series.name]), index=series.index, name=series.name)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Transform the features with the fitted parameters, one vectorized operation per column
+        :param df (pd.DataFrame) : Target Data Frame for transformation
+        :return: (pd.DataFrame) Transformed Data Frame
+        '''
+        if self.parameters_ is None:
+            raise ValueError(f"{type(self).__name__} is not fitted, please call .fit() first")
+        try:
+            new_df = self._output_frame(df)
+            print(f"{type(self).__name__} starts............")
+            for feature in self.features:
+                new_df[feature] = self.transform_column(new_df[feature])
+            print(f"{type(self).__name__} finished")
+            return new_df
+        except Exception as e:
+            raise IOError(f"{type(self).__name__} failed becuase of {e}")
+
+    def get_parameters(self) -> dict:
+        '''
+        Return the fitted state in a serializable form
+        :return: (dict) settings and parameters of every feature
+        '''
+        if self.parameters_ is None:
+            raise ValueError(f"{type(self).__name__} is not fitted, please call .fit() first")
+        return {'settings': self._settings(), 'parameters': self.parameters_}
+
+    def save_parameters(self, path: str) -> None:
+        '''
+        Save the fitted state as json so a serving process can load it with load_parameters()
+        :param path (str): File path of the json file
+        :return: None
+        '''
+        with open(path, 'w') as f:
+            json.dump(self.get_parameters(), f)
+
+    @classmethod
+    def load_parameters(cls, path: str) -> 'FittedTransformation':
+        '''
+        Load a fitted transformation saved by save_parameters()
+        :param path (str): File path of the json file
+        :return: (FittedTransformation) the fitted transformation
+        '''
+        with open(path) as f:
+            state = json.load(f)
+        strategy = cls(list(state['parameters']), **state['settings'])
+        strategy.parameters_ = state['parameters']
+        return strategy
+
+
+class PowerTransformation(FittedTransformation):
+    '''
+    Box-Cox or Yeo-Johnson power transformation making skewed columns more normal.
+    The exponent of every feature maximizes the profile log likelihood over a grid of candidates,
+    all candidates are scored at once with streaming per candidate moments, so the fit is vectorized
+    and can run over chunks. Box-Cox needs strictly positive values, Yeo-Johnson accepts any value
+    '''
+
+    METHODS = ('box-cox', 'yeo-johnson')
+
+    def __init__(self, features: list, method: str = 'yeo-johnson', standardize: bool = False,
+                 lambdas: list = None, inplace: bool = False):
+        '''
+        :param features (list[str]): List of column names
+        :param method (str): 'box-cox' or 'yeo-johnson'
+        :param standardize (bool): Scale the transformed features to zero mean and unit variance
+        :param lambdas (list[float]): Candidate exponents, defaults to -3 to 3 by 0.05
+        :param inplace (bool): Transform the given Data Frame instead of returning a new one
+        '''
+        if method not in PowerTransformation.METHODS:
+            raise ValueError(f"method should be one of {list(PowerTransformation.METHODS)}")
+        super().__init__(features, inplace)
+        self.method = method
+        self.standardize = standardize
+        self.lambdas = np.round(np.linspace(-3, 3, 121), 2) if lambdas is None else np.asarray(lambdas, dtype=float)
+
+    def _settings(self) -> dict:
+        return {'method': self.method, 'standardize': self.standardize, 'lambdas': self.lambdas.tolist()}
+
+    @staticmethod
+    def box_cox(values: np.ndarray, lmbda) -> np.ndarray:
+        '''
+        Box-Cox transformation, broadcasting values against one or many exponents
+        :param values (np.ndarray): strictly positive values
+        :param lmbda (float | np.ndarray): exponents
+        :return: (np.ndarray) transformed values
+        '''
+        log_values = np.log(values)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            powered = np.expm1(lmbda * log_values) / np.where(lmbda == 0, 1, lmbda)
+        return np.where(lmbda == 0, log_values, powered)
+
+    @staticmethod
+    def yeo_johnson(values: np.ndarray, lmbda) -> np.ndarray:
+        '''
+        Yeo-Johnson transformation, broadcasting values against one or many exponents
+        :param values (np.ndarray): values
+        :param lmbda (float | np.ndarray): exponents
+        :return: (np.ndarray) transformed values
+        '''
+        positive = values >= 0
+        log_values = np.log1p(np.abs(values))
+        sign = np.where(positive, 1.0, -1.0)
+        # x >= 0 uses the exponent lmbda on log(1 + x), x < 0 uses 2 - lmbda on log(1 - x) with the sign flipped
+        exponent = np.where(positive, lmbda, 2 - lmbda)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            powered = np.expm1(exponent * log_values) / np.where(exponent == 0, 1, exponent)
+        return sign * np.where(exponent == 0, log_values, powered)
+
+    def _power(self, values: np.ndarray, lmbda) -> np.ndarray:
+        if self.method == 'box-cox':
+            return PowerTransformation.box_cox(values, lmbda)
+        return PowerTransformation.yeo_johnson(values, lmbda)
+
+    def _new_accumulator(self) -> dict:
+        size = len(self.lambdas)
+        return {'count': 0, 'mean': np.zeros(size), 'm2': np.zeros(size), 'jacobian': 0.0}
+
+    def _update_accumulator(self, accumulator: dict, values: np.ndarray) -> dict:
+        if self.method == 'box-cox':
+            if (values <= 0).any():
+                raise ValueError("Box-Cox transformation needs strictly positive values, use method='yeo-johnson'")
+            accumulator['jacobian'] += np.log(values).sum()
+        else:
+            accumulator['jacobian'] += (np.sign(values) * np.log1p(np.abs(values))).sum()
+
+        # bound the memory of the rows x candidates matrix
+        block = max(1, 2 ** 20 // len(self.lambdas))
+        for start in range(0, len(values), block):
+            transformed = self._power(values[start:start + block, None], self.lambdas[None, :])
+            count = len(transformed)
+            with np.errstate(invalid='ignore', over='ignore'):
+                mean = transformed.mean(axis=0)
+                m2 = ((transformed - mean) ** 2).sum(axis=0)
+                total = accumulator['count'] + count
+                delta = mean - accumulator['mean']
+                accumulator['m2'] = accumulator['m2'] + m2 + delta ** 2 * accumulator['count'] * count / total
+                accumulator['mean'] = accumulator['mean'] + delta * count / total
+            accumulator['count'] = total
+        return accumulator
+
+    def _parameters_from(self, accumulator: dict) -> dict:
+        count = accumulator['count']
+        if count < 2:
+            return {'lambda': 1.0, 'mean': 0.0, 'std': 1.0}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_likelihood = -count / 2 * np.log(accumulator['m2'] / count) + (self.lambdas - 1) * accumulator['jacobian']
+        log_likelihood = np.where(np.isfinite(log_likelihood), log_likelihood, -np.inf)
+        best = int(np.argmax(log_likelihood))
+        std = np.sqrt(accumulator['m2'][best] / count)
+        return {'lambda': float(self.lambdas[best]),
+                'mean': float(accumulator['mean'][best]),
+                'std': float(std) if std > 0 else 1.0}
+
+    def _apply(self, values: np.ndarray, parameters: dict) -> np.ndarray:
+        if self.method == 'box-cox' and (values <= 0).any():
+            raise ValueError("Box-Cox transformation needs strictly positive values")
+        transformed = self._power(values, parameters['lambda'])
+        if self.standardize:
+            transformed = (transformed - parameters['mean']) / parameters['std']
+        return transformed
+
+
+class QuantileNormalTransformation(FittedTransformation):
+    '''
+    Map every feature through its empirical distribution onto a standard normal distribution.
+    fit() keeps n_quantiles reference quantiles of each feature, partial_fit() estimates them with a
+    mergeable quantile sketch, and transform() interpolates between the references
+    '''
+
+    BOUND = 1e-7
+
+    def __init__(self, features: list, n_quantiles: int = 1000, sketch_size: int = 2000, inplace: bool = False):
+        '''
+        :param features (list[str]): List of column names
+        :param n_quantiles (int): Number of reference quantiles
+        :param sketch_size (int): Size of the quantile sketches used by partial_fit()
+        :param inplace (bool): Transform the given Data Frame instead of returning a new one
+        '''
+        super().__init__(features, inplace)
+        self.n_quantiles = n_quantiles
+        self.sketch_size = sketch_size
+        levels = np.linspace(0, 1, n_quantiles)
+        normal = NormalDist()
+        self._levels = levels
+        self._scores = np.array([normal.inv_cdf(level)
+                                 for level in np.clip(levels, QuantileNormalTransformation.BOUND,
+                                                      1 - QuantileNormalTransformation.BOUND)])
+
+    def _settings(self) -> dict:
+        return {'n_quantiles': self.n_quantiles, 'sketch_size': self.sketch_size}
+
+    def fit(self, df: pd.DataFrame) -> 'QuantileNormalTransformation':
+        '''
+        Compute the exact reference quantiles of every feature
+        :param df (pd.DataFrame) : Training Data Frame
+        :return: (QuantileNormalTransformation) the fitted transformation
+        '''
+        self._accumulators = None
+        self.parameters_ = {}
+        for feature in self.features:
+            values = df[feature].to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            references = np.quantile(values, self._levels) if len(values) else np.zeros(self.n_quantiles)
+            self.parameters_[feature] = {'quantiles': references.tolist()}
+        return self
+
+    def _new_accumulator(self) -> QuantileSketch:
+        return QuantileSketch(k=self.sketch_size)
+
+    def _update_accumulator(self, accumulator: QuantileSketch, values: np.ndarray) -> QuantileSketch:
+        return accumulator.update(values)
+
+    def _parameters_from(self, accumulator: QuantileSketch) -> dict:
+        references = accumulator.quantiles(self._levels) if accumulator.count else np.zeros(self.n_quantiles)
+        return {'quantiles': references.tolist()}
+
+    def _apply(self, values: np.ndarray, parameters: dict) -> np.ndarray:
+        references = np.asarray(parameters['quantiles'])
+        # average the interpolation from both ends so tied references map to the middle of their scores
+        upward = np.interp(values, references, self._scores)
+        downward = -np.interp(-values, -references[::-1], -self._scores[::-1])
+        return (upward + downward) / 2
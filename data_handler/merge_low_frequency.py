@@ -1,9 +1,19 @@
-import matplotlib.pyplot as plt
+import json
+
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
 
+from data_handler.sketches import CountMinSketch, SpaceSaving
+
 class MergeLowShowBase(ABC):
+    '''
+    Base class for low frequency merge strategies.
+    Strategies with column_local = True merge every column on its own and implement
+    target_columns() and transform_column(), so a Pipeline can fuse them into one pass per column
+    '''
+
+    column_local = False
 
     @abstractmethod
     def handle(self, df: pd.DataFrame, features: list) -> pd.DataFrame:
@@ -18,13 +28,32 @@ class MergeLowShowBase(ABC):
 
 class MergeStrategy(MergeLowShowBase):
 
-    def __init__(self, threshold: float = 5):
+    column_local = True
+
+    COUNTINGS = ('exact', 'sketch')
+
+    def __init__(self, threshold: float = 5, counting: str = 'exact', epsilon: float = 0.001,
+                 delta: float = 0.01, seed: int = 0):
         '''
         Define the threshold for considering as low frequency class, default value is 2
         :param threshold (float): threshold to identify
+        :param counting (str): 'exact' counts every value, 'sketch' keeps fixed-size mergeable sketches
+                               (Space-Saving candidates checked by a count-min sketch) for high cardinality columns
+        :param epsilon (float): sketch error bound as a share of the rows, only used when counting is 'sketch'
+        :param delta (float): probability of exceeding the error bound, only used when counting is 'sketch'
+        :param seed (int): hash seed of the count-min sketch, strategies are only mergeable with the same seed
         '''
 
+        if counting not in MergeStrategy.COUNTINGS:
+            raise ValueError(f"counting should be one of {list(MergeStrategy.COUNTINGS)}")
+
         self.threshold = threshold
+        self.counting = counting
+        self.epsilon = epsilon
+        self.delta = delta
+        self.seed = seed
+        self.vocabulary_ = None
+        self._counters = {}
 
     def set_threshold(self, threshold):
         '''
@@ -61,9 +90,227 @@ class MergeStrategy(MergeLowShowBase):
         :return (pd.DataFrame): Cleaned and merged dataframe
         '''
 
+        if self.counting == 'sketch':
+            self.fit(df, features)
+            for feature in features:
+                df[feature] = MergeStrategy.fold_column(df[feature], self.vocabulary_[feature])
+            return df
+
         mapping_dict = MergeStrategy.check(df, features, self.threshold)
         for feature in features:
-            df[feature] = df[feature].map(lambda x: mapping_dict[feature].get(x, x))
+            df[feature] = MergeStrategy.merge_column(df[feature], list(mapping_dict[feature]))
 
         return df
 
+    def target_columns(self, df: pd.DataFrame, features: list = None) -> list:
+        '''
+        Columns merged by the strategy, the learnt features when fitted and no features are given
+        :param df (pd.DataFrame): Target dataframe
+        :param features (list[str]): List of features to merge
+        :return (list[str]): column names
+        '''
+        if features:
+            return list(features)
+        if self.vocabulary_ is None:
+            raise ValueError("MergeStrategy needs the features to merge or a fitted vocabulary")
+        return [feature for feature in self.vocabulary_ if feature in df.columns]
+
+    def transform_column(self, series: pd.Series) -> pd.Series:
+        '''
+        Merge the low frequency values of a single column, with the learnt vocabulary once fitted
+        or with the frequencies of the column itself
+        :param series (pd.Series): Target column
+        :return (pd.Series): Merged column
+        '''
+        if self.vocabulary_ is not None and series.name in self.vocabulary_:
+            return MergeStrategy.fold_column(series, self.vocabulary_[series.name])
+        frame = series.to_frame()
+        if self.counting == 'sketch':
+            learnt = MergeStrategy(self.threshold, self.counting, self.epsilon, self.delta, self.seed).fit(frame, [series.name])
+            return MergeStrategy.fold_column(series, learnt.vocabulary_[series.name])
+        return MergeStrategy.merge_column(series, list(MergeStrategy.check(frame, [series.name], self.threshold)[series.name]))
+
+    @staticmethod
+    def merge_column(series: pd.Series, rare: list, label: str = 'SMALL_GROUP') -> pd.Series:
+        '''
+        Replace the rare values of a column with the label in one vectorized pass. Categorical columns are
+        remapped on their codes and stay categorical, other columns are replaced through a hash lookup (isin)
+        :param series (pd.Series): Target column
+        :param rare (list): Values to be merged
+        :param label (str): Value replacing the rare values
+        :return (pd.Series): Merged column
+        '''
+
+        if len(rare) == 0:
+            return series
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            is_rare = categories.isin(rare)
+            kept = categories[~is_rare]
+            new_categories = kept if label in kept else kept.append(pd.Index([label]))
+            positions = new_categories.get_indexer(categories)
+            positions[is_rare] = new_categories.get_loc(label)
+            codes = series.cat.codes.to_numpy()
+            new_codes = np.where(codes >= 0, positions[codes], -1)
+            merged = pd.Categorical.from_codes(new_codes, new_categories, ordered=series.cat.ordered)
+            return pd.Series(merged, index=series.index, name=series.name)
+
+        return MergeStrategy._replace_values(series, series.isin(rare).to_numpy(), label)
+
+    @staticmethod
+    def fold_column(series: pd.Series, vocabulary: list, label: str = 'SMALL_GROUP') -> pd.Series:
+        '''
+        Replace every value outside the vocabulary with the label, missing values are kept
+        :param series (pd.Series): Target column
+        :param vocabulary (list): Values to be kept
+        :param label (str): Value replacing the other values
+        :return (pd.Series): Merged column
+        '''
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            return MergeStrategy.merge_column(series, list(categories[~categories.isin(vocabulary)]), label)
+
+        is_rare = ~series.isin(vocabulary).to_numpy() & series.notna().to_numpy()
+        return MergeStrategy._replace_values(series, is_rare, label)
+
+    @staticmethod
+    def _replace_values(series: pd.Series, is_rare: np.ndarray, label: str) -> pd.Series:
+        if not is_rare.any():
+            return series
+        values = series.to_numpy(dtype=object, copy=True)
+        values[is_rare] = label
+        return pd.Series(values, index=series.index, name=series.name)
+
+    def fit(self, df: pd.DataFrame, features: list) -> 'MergeStrategy':
+        '''
+        Learn the frequent values of every feature once, so the same categories are merged for every later batch
+        :param df (pd.DataFrame): Training dataframe
+        :param features (list[str]): List of features to learn
+        :return (MergeStrategy): the fitted strategy
+        '''
+
+        self._counters = {}
+        return self.partial_fit(df, features)
+
+    def partial_fit(self, df: pd.DataFrame, features: list) -> 'MergeStrategy':
+        '''
+        Update the value counts with one more batch and refresh the vocabulary, so a file too large for memory
+        can be learnt chunk by chunk. In sketch mode memory stays fixed whatever the number of distinct values
+        :param df (pd.DataFrame): Training batch
+        :param features (list[str]): List of features to learn
+        :return (MergeStrategy): the fitted strategy
+        '''
+
+        for feature in features:
+            if self.counting == 'sketch':
+                heavy, table = self._counters.setdefault(feature, self._new_sketches())
+                heavy.update(df[feature])
+                table.update(df[feature])
+            else:
+                self._counters[feature] = MergeStrategy._add_counts(self._counters.get(feature),
+                                                                    df[feature].value_counts())
+
+        self._refresh_vocabulary()
+        return self
+
+    def merge(self, other: 'MergeStrategy') -> 'MergeStrategy':
+        '''
+        Combine the counts learnt by another strategy, e.g. one fitted on other chunks or by another process
+        :param other (MergeStrategy): strategy with the same counting settings
+        :return (MergeStrategy): the fitted strategy
+        '''
+
+        if (self.counting, self.epsilon, self.delta, self.seed) != (other.counting, other.epsilon, other.delta, other.seed):
+            raise ValueError("Only strategies with the same counting, epsilon, delta and seed can be merged")
+
+        for feature, other_counter in other._counters.items():
+            if self.counting == 'sketch':
+                heavy, table = self._counters.setdefault(feature, self._new_sketches())
+                heavy.merge(other_counter[0])
+                table.merge(other_counter[1])
+            else:
+                self._counters[feature] = MergeStrategy._add_counts(self._counters.get(feature), other_counter)
+
+        self._refresh_vocabulary()
+        return self
+
+    def _new_sketches(self) -> tuple:
+        return SpaceSaving(int(np.ceil(1 / self.epsilon))), CountMinSketch(self.epsilon, self.delta, self.seed)
+
+    @staticmethod
+    def _add_counts(counts: pd.Series, other: pd.Series) -> pd.Series:
+        return other if counts is None else counts.add(other, fill_value=0)
+
+    def _frequencies(self, feature: str) -> tuple:
+        '''
+        Counts of the candidate values of a feature. In sketch mode the Space-Saving summary keeps every value
+        above epsilon of the rows and both sketches only overcount, so the smaller of the two estimates is used
+        :param feature (str): learnt feature
+        :return (pd.Series, int): counts sorted in descending order and number of non-missing rows
+        '''
+
+        counter = self._counters[feature]
+        if self.counting == 'sketch':
+            heavy, table = counter
+            counts = pd.Series(np.minimum(heavy.counts.to_numpy(), table.estimate(heavy.counts.index.to_series())),
+                               index=heavy.counts.index)
+            return counts.sort_values(ascending=False, kind='stable'), heavy.total
+        return counter.sort_values(ascending=False, kind='stable'), counter.sum()
+
+    def _refresh_vocabulary(self) -> None:
+        vocabulary = {}
+        for feature in self._counters:
+            counts, total = self._frequencies(feature)
+            frequent = counts[counts / total * 100 > self.threshold].index.to_list() if total else []
+            vocabulary[feature] = [value.item() if isinstance(value, np.generic) else value for value in frequent]
+        self.vocabulary_ = vocabulary
+
+    def transform(self, df: pd.DataFrame, features: list = None) -> pd.DataFrame:
+        '''
+        Merge the values outside the learnt vocabulary, including values never seen by fit(), into SMALL_GROUP
+        :param df (pd.DataFrame): Target dataframe
+        :param features (list[str]): List of features to merge, defaults to every learnt feature
+        :return (pd.DataFrame): Merged dataframe
+        '''
+
+        if self.vocabulary_ is None:
+            raise ValueError("MergeStrategy is not fitted, please call .fit() first")
+
+        new_df = df.copy(deep=False)
+        for feature in (features if features else list(self.vocabulary_)):
+            new_df[feature] = MergeStrategy.fold_column(new_df[feature], self.vocabulary_[feature])
+        return new_df
+
+    def get_vocabulary(self) -> dict:
+        '''
+        Return the fitted state in a serializable form
+        :return (dict): threshold and frequent values of every feature
+        '''
+        if self.vocabulary_ is None:
+            raise ValueError("MergeStrategy is not fitted, please call .fit() first")
+        return {'threshold': self.threshold, 'vocabulary': self.vocabulary_}
+
+    def save_vocabulary(self, path: str) -> None:
+        '''
+        Save the fitted state as json so a serving process can load it with MergeStrategy.load_vocabulary()
+        :param path (str): File path of the json file
+        :return: None
+        '''
+        with open(path, 'w') as f:
+            json.dump(self.get_vocabulary(), f)
+
+    @classmethod
+    def load_vocabulary(cls, path: str) -> 'MergeStrategy':
+        '''
+        Load a fitted strategy saved by save_vocabulary()
+        :param path (str): File path of the json file
+        :return (MergeStrategy): the fitted strategy
+        '''
+        with open(path) as f:
+            state = json.load(f)
+        strategy = cls(state['threshold'])
+        strategy.vocabulary_ = state['vocabulary']
+        return strategy
+
@@ -1,16 +1,35 @@
-import matplotlib.pyplot as plt
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
 
-from fontTools.subset import subset
+from data_handler.parallel import map_column_blocks
+from data_handler.sketches import RunningMoments, QuantileSketch, SpaceSaving
 
 
 class MissingValueFixBase(ABC):
     '''
-    Base class defining different Missing Value Fix Strategies
+    Base class defining different Missing Value Fix Strategies.
+    With inplace = True the strategies modify the given DataFrame, otherwise they work on a
+    shallow copy and only the modified columns are replaced, so unchanged columns are never copied.
+    Strategies with column_local = True fix every column on its own and implement
+    target_columns() and transform_column(), so a Pipeline can fuse them into one pass per column
     '''
 
+    inplace = False
+    column_local = False
+
+    def _output_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Frame the strategy writes its result columns into
+        :param df (pd.DataFrame) : Target DataFrame
+        :return (pd.DataFrame) : df itself in inplace mode, a shallow copy sharing the column data otherwise
+        '''
+        return df if self.inplace else df.copy(deep = False)
+
     def handle(self, df: pd.DataFrame, feature: list = None) -> pd.DataFrame:
         '''
         Base Method for different Strategy to handle missing value
@@ -25,14 +44,16 @@ class Drop_Strategy(MissingValueFixBase):
     Strategy to drop selected missing value
     '''
 
-    def __init__(self, axis: int = 0, threshold: int = None):
+    def __init__(self, axis: int = 0, threshold: int = None, inplace: bool = False):
         '''
         Set the initial value for the drop strategy, default drop on row with any none to drop
         :param axis: axis to perfrom the drop action
         :param threshold: minumum number of not-none value to be kept
+        :param inplace: drop from the given DataFrame instead of returning a new one
         '''
         self.axis = axis
         self.threshold = threshold
+        self.inplace = inplace
 
     def handle(self, df: pd.DataFrame, feature: list = None) -> pd.DataFrame:
         '''
@@ -43,17 +64,18 @@ class Drop_Strategy(MissingValueFixBase):
         '''
 
         try:
-            new_df = df.copy()
+            options = {'axis': self.axis}
             if feature is not None:
-                if self.threshold:
-                    new_df.dropna(subset = feature, axis = self.axis, thresh = self.threshold, inplace = True)
-                else:
-                    new_df.dropna(subset=feature, axis=self.axis, inplace=True)
+                options['subset'] = feature
+            if self.threshold:
+                options['thresh'] = self.threshold
+
+            # dropna already builds a new frame holding only the kept rows, no upfront copy is needed
+            if self.inplace:
+                df.dropna(inplace = True, **options)
+                new_df = df
             else:
-                if not self.threshold:
-                    new_df.dropna(axis=self.axis, inplace=True)
-                else:
-                    new_df.dropna(axis=self.axis, thresh= self.threshold, inplace=True)
+                new_df = df.dropna(**options)
             print("Missing value dropped")
             return new_df
         except Exception as e:
@@ -65,14 +87,25 @@ class Fill_Strategy(MissingValueFixBase):
     Strategy to fill missing value with specific method
     '''
 
-    def __init__(self, method: str = 'mean', value: str = None):
+    column_local = True
+
+    def __init__(self, method: str = 'mean', value: str = None, inplace: bool = False, sketch_size: int = 200,
+                 workers: int = None):
         '''
         Initialize the strategy with default mean filling method, value is used for constant method.
         :param method (str) : Method used to fill the missing value
         :param value: (str) : Default value for constant method
+        :param inplace: (bool) : Fill the given DataFrame instead of returning a new one
+        :param sketch_size: (int) : Size of the median and mode sketches used by partial_fit()
+        :param workers: (int) : Number of threads computing and filling blocks of columns, None works column by column
         '''
         self.method = method
         self.value = value
+        self.inplace = inplace
+        self.sketch_size = sketch_size
+        self.workers = workers
+        self.statistics_ = None
+        self._accumulators = None
 
     def set_method(self, method: str):
         '''
@@ -91,57 +124,238 @@ class Fill_Strategy(MissingValueFixBase):
         self.value = value
 
 
+    def compute_statistics(self, df: pd.DataFrame, feature: list = None) -> dict:
+        '''
+        Compute the fill value of every target column with the current method
+        :param df (pd.DataFrame) : DataFrame to learn the fill values from
+        :param feature: list = None: Specific columns, mean and median default to the numeric columns,
+                                     mode and constant default to every column
+        :return (dict) : column name to fill value, as plain python values
+        '''
+
+        if isinstance(feature, str):
+            feature = [feature]
+
+        if self.method in ('mean', 'median'):
+            columns = feature if feature else df.select_dtypes(include = 'number').columns.to_list()
+            values = map_column_blocks(lambda block: getattr(df[block], self.method)().to_list(), columns,
+                                       self.workers)
+            statistics = dict(zip(columns, values))
+
+        elif self.method == 'mode':
+            columns = feature if feature else df.columns.to_list()
+            statistics = {}
+            for col in columns:
+                mode = df[col].mode()
+                if len(mode):
+                    statistics[col] = mode.iloc[0]
+
+        elif self.method == 'constant':
+            columns = feature if feature else df.columns.to_list()
+            statistics = {col: self.value for col in columns}
+
+        else:
+            raise ValueError(f"Unknown filling method {self.method}, selections are: 'mean', 'median', 'mode', 'constant'")
+
+        return {col: value.item() if isinstance(value, np.generic) else value for col, value in statistics.items()}
+
+    def fit(self, df: pd.DataFrame, feature: list = None) -> 'Fill_Strategy':
+        '''
+        Learn the fill values once so that later batches are filled consistently with transform()
+        :param df (pd.DataFrame) : DataFrame to learn the fill values from
+        :param feature: list = None: Specific columns to learn
+        :return (Fill_Strategy) : the fitted strategy
+        '''
+        self.statistics_ = self.compute_statistics(df, feature)
+        self._accumulators = None
+        return self
+
+    def partial_fit(self, df: pd.DataFrame, feature: list = None) -> 'Fill_Strategy':
+        '''
+        Update the fill values with one more chunk, so data larger than memory can be fitted chunk by chunk.
+        Mean is exact, median comes from a mergeable quantile sketch and mode from a heavy hitter summary
+        :param df (pd.DataFrame) : Chunk to learn the fill values from
+        :param feature: list = None: Specific columns to learn. Mean and median default to the numeric columns,
+                                     checked on every chunk: a chunk of nulls only is read as float by pandas,
+                                     so a column is only taken once it shows numeric values and dropped if it
+                                     shows text later. Mode and constant default to the columns of the first chunk
+        :return (Fill_Strategy) : the fitted strategy
+        '''
+
+        if self._accumulators is None:
+            self._numeric_defaults = not feature and self.method in ('mean', 'median')
+            self._excluded = set()
+            if isinstance(feature, str):
+                columns = [feature]
+            elif feature:
+                columns = list(feature)
+            elif self._numeric_defaults:
+                columns = []
+            else:
+                columns = df.columns.to_list()
+            self._accumulators = {col: self._new_accumulator() for col in columns}
+
+        if self._numeric_defaults:
+            for col in df.columns:
+                if col in self._excluded or not df[col].notna().any():
+                    continue
+                if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+                    if col not in self._accumulators:
+                        self._accumulators[col] = self._new_accumulator()
+                else:
+                    self._excluded.add(col)
+                    self._accumulators.pop(col, None)
+
+        for col, accumulator in self._accumulators.items():
+            if accumulator is not None:
+                accumulator.update(df[col].to_numpy() if self.method != 'mode' else df[col])
+
+        self.statistics_ = {col: self._accumulated_value(accumulator)
+                            for col, accumulator in self._accumulators.items()}
+        self.statistics_ = {col: value for col, value in self.statistics_.items() if value is not None}
+        return self
+
+    def _new_accumulator(self):
+        '''
+        Create the streaming accumulator of the current method
+        :return: accumulator, None for the constant method
+        '''
+        if self.method == 'mean':
+            return RunningMoments()
+        if self.method == 'median':
+            return QuantileSketch(k = self.sketch_size)
+        if self.method == 'mode':
+            return SpaceSaving(capacity = self.sketch_size)
+        if self.method == 'constant':
+            return None
+        raise ValueError(f"Unknown filling method {self.method}, selections are: 'mean', 'median', 'mode', 'constant'")
+
+    def _accumulated_value(self, accumulator):
+        '''
+        Read the fill value out of a streaming accumulator
+        :param accumulator: accumulator from _new_accumulator()
+        :return: fill value as a plain python value, None when no value was seen
+        '''
+        if accumulator is None:
+            return self.value
+        if isinstance(accumulator, RunningMoments):
+            return float(accumulator.mean) if accumulator.count else np.nan
+        if isinstance(accumulator, QuantileSketch):
+            return accumulator.quantile(0.5)
+        top = accumulator.top(1)
+        if len(top) == 0:
+            return None
+        value = top.index[0]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Fill the missing values with the statistics learnt by fit()
+        :param df (pd.DataFrame) : Target DataFrame with missing
+        :return (pd.DataFrame) : Processed DataFrame after the filling
+        '''
+        if self.statistics_ is None:
+            raise ValueError("Fill_Strategy is not fitted, please call .fit() first")
+        return self._fill(df, self.statistics_)
+
+    def _fill(self, df: pd.DataFrame, statistics: dict) -> pd.DataFrame:
+        '''
+        Fill the columns of the statistics present in the DataFrame, only the columns holding
+        missing values are replaced
+        :param df (pd.DataFrame) : Target DataFrame with missing
+        :param statistics (dict) : column name to fill value
+        :return (pd.DataFrame) : Processed DataFrame after the filling
+        '''
+        new_df = self._output_frame(df)
+        columns = [col for col in statistics if col in new_df.columns]
+        filled = map_column_blocks(lambda block: [new_df[col].fillna(statistics[col]) if new_df[col].hasnans else None
+                                                  for col in block], columns, self.workers)
+        for col, series in zip(columns, filled):
+            if series is not None:
+                new_df[col] = series
+        return new_df
+
+    def get_statistics(self) -> dict:
+        '''
+        Return the fitted state in a serializable form
+        :return (dict) : method and column fill values
+        '''
+        if self.statistics_ is None:
+            raise ValueError("Fill_Strategy is not fitted, please call .fit() first")
+        return {'method': self.method, 'value': self.value, 'statistics': self.statistics_}
+
+    def save_statistics(self, path: str) -> None:
+        '''
+        Save the fitted state as json so a serving process can load it with Fill_Strategy.load_statistics()
+        :param path (str): File path of the json file
+        :return: None
+        '''
+        with open(path, 'w') as f:
+            json.dump(self.get_statistics(), f)
+
+    @classmethod
+    def from_statistics(cls, state: dict) -> 'Fill_Strategy':
+        '''
+        Rebuild a fitted strategy from get_statistics()
+        :param state (dict): method and column fill values
+        :return (Fill_Strategy) : the fitted strategy
+        '''
+        strategy = cls(state['method'], state.get('value'))
+        strategy.statistics_ = dict(state['statistics'])
+        return strategy
+
+    @classmethod
+    def load_statistics(cls, path: str) -> 'Fill_Strategy':
+        '''
+        Load a fitted strategy saved by save_statistics()
+        :param path (str): File path of the json file
+        :return (Fill_Strategy) : the fitted strategy
+        '''
+        with open(path) as f:
+            return cls.from_statistics(json.load(f))
+
+    def target_columns(self, df: pd.DataFrame, feature: list = None) -> list:
+        '''
+        Columns the strategy may fill, the learnt columns once fitted
+        :param df (pd.DataFrame) : Target DataFrame
+        :param feature: list = None: Specific columns, defaults to every column
+        :return (list) : column names
+        '''
+        if self.statistics_ is not None:
+            return [col for col in self.statistics_ if col in df.columns]
+        if isinstance(feature, str):
+            return [feature]
+        return list(feature) if feature else df.columns.to_list()
+
+    def transform_column(self, series: pd.Series) -> pd.Series:
+        '''
+        Fill a single column, with the learnt value once fitted or with the statistic of the column itself.
+        Mean and median leave non numeric columns unchanged
+        :param series (pd.Series) : Target column
+        :return (pd.Series) : Filled column
+        '''
+        if not series.hasnans:
+            return series
+        if self.statistics_ is not None:
+            return series.fillna(self.statistics_[series.name]) if series.name in self.statistics_ else series
+        if self.method in ('mean', 'median') and not pd.api.types.is_numeric_dtype(series):
+            return series
+        statistics = self.compute_statistics(series.to_frame(), [series.name])
+        return series.fillna(statistics[series.name]) if series.name in statistics else series
+
     def handle(self, df: pd.DataFrame, feature: list = None) -> pd.DataFrame:
         '''
-        Base Method for drop Strategy to handle missing value, if not feature provided, look at all table
+        Base Method for fill Strategy to handle missing value, the fill values are computed on df itself,
+        if not feature provided, look at all table
         :param df (pd.DataFrame) : Target DataFrame with missing
         :param feature: list = None: Specific columns to perform the fix
-        :return (pd.DataFrame) : Processed DataFrame after the drop
+        :return (pd.DataFrame) : Processed DataFrame after the filling
         '''
 
         print(f"Perform the filling strategy {self.method}.........")
 
-        new_df = df.copy()
         try:
-            if self.method == 'mean':
-                if feature:
-                    new_df[feature] = new_df[feature].fillna(new_df[feature].mean())
-                    # for col in feature:
-                    #     new_df[col] = new_df[col].fillna(new_df[col].mean())
-                else:
-                    columns = new_df.select_dtypes(include = 'number').columns.to_list()
-                    new_df[columns] = new_df[columns].fillna(new_df[columns].mean())
-                    # for col in new_df.select_dtypes(include = 'number').columns:
-                    #     new_df[col] = new_df[col].fillna(new_df[col].mean())
-
-            if self.method == 'median':
-                if feature:
-                    new_df[feature] = new_df[feature].fillna(new_df[feature].median())
-
-                else:
-                    columns = new_df.select_dtypes(include = 'number').columns.to_list()
-                    new_df[columns] = new_df[columns].fillna(new_df[columns].median())
-
-            if self.method == 'mode':
-                if feature:
-                    new_df[feature] = new_df[feature].fillna(new_df[feature].mode())
-                    # for col in feature:
-                    #     new_df[col] = new_df[col].fillna(new_df[col].mode())
-                else:
-                    columns = new_df.columns
-                    new_df[columns] = new_df[columns].fillna(new_df[columns].mode())
-                        # new_df[col] = new_df[col].fillna(new_df[col].mode())
-
-            if self.method == 'constant':
-                if feature:
-                    new_df[feature] = new_df[feature].fillna(self.value)
-                    # for col in feature:
-                    #     new_df[col] = new_df[col].fillna(self.value)
-                else:
-                    columns = new_df.columns
-                    new_df[columns] = new_df[columns].fillna(self.value)
-                    # for col in new_df.columns:
-                    #     new_df[col] = new_df[col].fillna(self.value)
+            new_df = self._fill(df, self.compute_statistics(df, feature))
 
             print("Filling finished, if want to change different method, please call .set_method(), /n"
                   "selections are: 'mean', 'mode', 'constant'/n"
@@ -152,17 +366,292 @@ class Fill_Strategy(MissingValueFixBase):
         except Exception as e:
             raise IOError("Failed to fill with specific method")
 
+class GroupFill_Strategy(MissingValueFixBase):
+
+    '''
+    Strategy to fill missing value with a statistic of the row's group, e.g. the median LotFrontage
+    of each Neighborhood. The group statistics are computed in one groupby pass and broadcast back
+    to the rows by index lookup, without any python loop over the groups
+    '''
+
+    def __init__(self, group_by, method: str = 'median', fallback: bool = True, inplace: bool = False):
+        '''
+        :param group_by (str | list[str]) : Column or columns defining the groups
+        :param method (str) : 'mean', 'median' or 'mode'
+        :param fallback (bool) : Fill rows whose group has no value with the statistic of the whole column
+        :param inplace (bool) : Fill the given DataFrame instead of returning a new one
+        '''
+        self.group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        self.method = method
+        self.fallback = fallback
+        self.inplace = inplace
+        self.statistics_ = None
+        self.fallback_ = None
+
+    def _target_columns(self, df: pd.DataFrame, feature: list = None) -> list:
+        if isinstance(feature, str):
+            return [feature]
+        if feature:
+            return list(feature)
+        if self.method in ('mean', 'median'):
+            columns = df.select_dtypes(include = 'number').columns.to_list()
+        else:
+            columns = df.columns.to_list()
+        return [col for col in columns if col not in self.group_by]
+
+    def compute_statistics(self, df: pd.DataFrame, feature: list = None) -> tuple:
+        '''
+        Compute the statistic of every target column for every group
+        :param df (pd.DataFrame) : DataFrame to learn the statistics from
+        :param feature: list = None: Specific columns, mean and median default to the numeric columns
+        :return (tuple) : (DataFrame of statistics indexed by the group keys, dict of whole column statistics)
+        '''
+        columns = self._target_columns(df, feature)
+        grouped = df.groupby(self.group_by, observed = True, sort = False)
+
+        if self.method in ('mean', 'median'):
+            statistics = grouped[columns].agg(self.method)
+
+        elif self.method == 'mode':
+            modes = []
+            for col in columns:
+                counts = df.groupby(self.group_by + [col], observed = True, sort = False).size()
+                counts = counts.rename('__count__').reset_index()
+                # most frequent value per group, ties resolved to the smallest value like Series.mode
+                top = (counts.sort_values([col], kind = 'stable')
+                             .sort_values('__count__', ascending = False, kind = 'stable')
+                             .drop_duplicates(self.group_by))
+                modes.append(top.set_index(self.group_by)[col])
+            statistics = pd.concat(modes, axis = 1) if modes else pd.DataFrame()
+
+        else:
+            raise ValueError(f"Unknown filling method {self.method}, selections are: 'mean', 'median', 'mode'")
+
+        fallback = Fill_Strategy(self.method).compute_statistics(df, columns) if self.fallback else {}
+        return statistics, fallback
+
+    def fit(self, df: pd.DataFrame, feature: list = None) -> 'GroupFill_Strategy':
+        '''
+        Learn the group statistics once so later batches are filled consistently with transform()
+        :param df (pd.DataFrame) : DataFrame to learn the statistics from
+        :param feature: list = None: Specific columns to learn
+        :return (GroupFill_Strategy) : the fitted strategy
+        '''
+        self.statistics_, self.fallback_ = self.compute_statistics(df, feature)
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Fill the missing values with the group statistics learnt by fit()
+        :param df (pd.DataFrame) : Target DataFrame with missing
+        :return (pd.DataFrame) : Processed DataFrame after the filling
+        '''
+        if self.statistics_ is None:
+            raise ValueError("GroupFill_Strategy is not fitted, please call .fit() first")
+        return self._fill(df, self.statistics_, self.fallback_)
+
+    def _fill(self, df: pd.DataFrame, statistics: pd.DataFrame, fallback: dict) -> pd.DataFrame:
+        '''
+        Broadcast the group statistics to the rows and fill the missing values
+        :param df (pd.DataFrame) : Target DataFrame with missing
+        :param statistics (pd.DataFrame) : statistics indexed by the group keys
+        :param fallback (dict) : whole column statistics for rows without a group value
+        :return (pd.DataFrame) : Processed DataFrame after the filling
+        '''
+        new_df = self._output_frame(df)
+        if len(self.group_by) == 1:
+            keys = pd.Index(new_df[self.group_by[0]])
+        else:
+            keys = pd.MultiIndex.from_frame(new_df[self.group_by])
+        row_statistics = statistics.reindex(keys)
+
+        for col in statistics.columns:
+            if col not in new_df.columns or not new_df[col].hasnans:
+                continue
+            filled = new_df[col].fillna(pd.Series(row_statistics[col].to_numpy(), index = new_df.index))
+            if col in fallback:
+                filled = filled.fillna(fallback[col])
+            new_df[col] = filled
+        return new_df
+
+    def handle(self, df: pd.DataFrame, feature: list = None) -> pd.DataFrame:
+        '''
+        Base Method for group fill Strategy to handle missing value, the statistics are computed on df itself
+        :param df (pd.DataFrame) : Target DataFrame with missing
+        :param feature: list = None: Specific columns to perform the fix
+        :return (pd.DataFrame) : Processed DataFrame after the filling
+        '''
+
+        print(f"Perform the group filling strategy {self.method} by {self.group_by}.........")
+
+        try:
+            statistics, fallback = self.compute_statistics(df, feature)
+            return self._fill(df, statistics, fallback)
+        except Exception as e:
+            raise IOError("Failed to fill with group statistics")
+
+class KNN_Strategy(MissingValueFixBase):
+
+    '''
+    Strategy to fill missing numeric value with the mean of the k nearest rows that have the value.
+    Distances are nan-euclidean over the standardized numeric columns (only the columns present in
+    both rows are compared, scaled up to all columns) and are computed block by block with matrix
+    products, so memory stays bounded by max_memory_mb whatever the number of rows.
+    The exact search costs receivers x rows, max_donors caps the donor pool with a random sample
+    so the cost grows linearly with the number of rows
+    '''
+
+    def __init__(self, n_neighbors: int = 5, distance_features: list = None, max_memory_mb: float = 256,
+                 workers: int = None, max_donors: int = None, seed: int = 0, inplace: bool = False):
+        '''
+        :param n_neighbors (int) : Number of neighbours averaged for each missing value
+        :param distance_features (list) : Numeric columns used for the distance, defaults to every numeric column
+        :param max_memory_mb (float) : Memory budget of one block: its distances, their temporaries and the donor copies
+        :param workers (int) : Number of threads computing blocks in parallel, None or 1 runs them one by one
+        :param max_donors (int) : Size of the random donor pool, None searches every row
+        :param seed (int) : Seed of the donor sample
+        :param inplace (bool) : Fill the given DataFrame instead of returning a new one
+        '''
+        self.n_neighbors = n_neighbors
+        self.distance_features = distance_features
+        self.max_memory_mb = max_memory_mb
+        self.workers = workers
+        self.max_donors = max_donors
+        self.seed = seed
+        self.inplace = inplace
+
+    # bytes per block x donors cell at the peak of _impute_block(): the float32 distances and a float32
+    # matrix product temporary with the float32 overlap counts, then the distances, the float32 candidate
+    # distances and the int64 argpartition indices
+    BLOCK_CELL_BYTES = 4 + 4 + 8
+    # float32 bytes per donor x feature cell: donor values, donor presence and the squared donor values
+    DONOR_CELL_BYTES = 3 * 4
+
+    def _block_rows(self, n_donors: int, n_features: int) -> int:
+        '''
+        Number of receiver rows per block so that the donor copies and every array of block x donors alive at
+        once fit max_memory_mb
+        '''
+        n_donors = max(n_donors, 1)
+        budget = self.max_memory_mb * 1024 ** 2 - KNN_Strategy.DONOR_CELL_BYTES * n_donors * n_features
+        return max(1, int(budget // (KNN_Strategy.BLOCK_CELL_BYTES * n_donors)))
+
+    def _impute_block(self, rows: np.ndarray, values: np.ndarray, present: np.ndarray, targets: np.ndarray,
+                      pool: np.ndarray) -> dict:
+        '''
+        Compute the fills of one block of receiver rows
+        :param rows (np.ndarray) : positions of the receiver rows
+        :param values (np.ndarray) : standardized distance features, missing set to 0
+        :param present (np.ndarray) : 1.0 where the distance feature is present
+        :param targets (np.ndarray) : raw values of the target columns
+        :param pool (np.ndarray) : positions of the donor rows
+        :return (dict) : target column position to (receiver row positions, fill values)
+        '''
+        block_values, block_present = values[rows], present[rows]
+        pool_values, pool_present = values[pool], present[pool]
+        shared = block_present @ pool_present.T
+        distances = block_values @ pool_values.T
+        distances *= -2
+        distances += (block_values ** 2) @ pool_present.T
+        distances += block_present @ (pool_values ** 2).T
+        np.maximum(distances, 0, out = distances)
+        distances *= values.shape[1]
+        no_overlap = shared == 0
+        shared[no_overlap] = 1
+        distances /= shared
+        distances[no_overlap] = np.inf
+        # free the overlap matrices before the candidate distances and their indices are allocated
+        del shared, no_overlap
+
+        fills = {}
+        for j in range(targets.shape[1]):
+            target = targets[pool, j]
+            receivers = np.isnan(targets[rows, j])
+            donors = np.flatnonzero(~np.isnan(target))
+            if not receivers.any() or len(donors) == 0:
+                continue
+            candidate = distances[np.ix_(receivers, donors)]
+            k = min(self.n_neighbors, len(donors))
+            # copy the k nearest so the full index matrix, and the candidates below, are freed before the next column
+            nearest = np.argpartition(candidate, k - 1, axis = 1)[:, :k].copy()
+            nearest_distance = np.take_along_axis(candidate, nearest, axis = 1)
+            del candidate
+            neighbour_values = np.where(np.isfinite(nearest_distance), target[donors][nearest], np.nan)
+            with np.errstate(invalid = 'ignore'):
+                counts = np.isfinite(nearest_distance).sum(axis = 1)
+                sums = np.nansum(neighbour_values, axis = 1)
+                fills[j] = (rows[receivers], np.where(counts > 0, sums / np.maximum(counts, 1), np.nan))
+        return fills
+
+    def handle(self, df: pd.DataFrame, feature: list = None) -> pd.DataFrame:
+        '''
+        Base Method for KNN Strategy to handle missing value, if not feature provided, every numeric column is filled
+        :param df (pd.DataFrame) : Target DataFrame with missing
+        :param feature: list = None: Specific numeric columns to perform the fix
+        :return (pd.DataFrame) : Processed DataFrame after the filling
+        '''
+
+        print(f"Perform the KNN filling strategy with {self.n_neighbors} neighbours.........")
+
+        try:
+            if isinstance(feature, str):
+                feature = [feature]
+            numeric = df.select_dtypes(include = 'number').columns.to_list()
+            columns = [col for col in (feature if feature else numeric) if df[col].hasnans]
+            distance_features = self.distance_features if self.distance_features else numeric
+
+            new_df = self._output_frame(df)
+            if not columns:
+                return new_df
+
+            raw = df[distance_features].to_numpy(dtype = float, na_value = np.nan)
+            with np.errstate(invalid = 'ignore', divide = 'ignore'):
+                scale = np.nanstd(raw, axis = 0)
+                standardized = (raw - np.nanmean(raw, axis = 0)) / np.where(scale > 0, scale, 1)
+            # float32 halves the memory traffic of the distance blocks, enough precision to rank neighbours
+            present = (~np.isnan(standardized)).astype(np.float32)
+            values = np.nan_to_num(standardized, nan = 0.0).astype(np.float32)
+            targets = df[columns].to_numpy(dtype = float, na_value = np.nan)
+
+            pool = np.arange(len(df))
+            if self.max_donors and self.max_donors < len(df):
+                pool = np.sort(np.random.default_rng(self.seed).choice(len(df), self.max_donors, replace = False))
+
+            receivers = np.flatnonzero(np.isnan(targets).any(axis = 1))
+            block_rows = self._block_rows(len(pool), values.shape[1])
+            blocks = [receivers[start:start + block_rows] for start in range(0, len(receivers), block_rows)]
+
+            impute = lambda rows: self._impute_block(rows, values, present, targets, pool)
+            if self.workers and self.workers > 1:
+                with ThreadPoolExecutor(max_workers = self.workers) as executor:
+                    results = list(executor.map(impute, blocks))
+            else:
+                results = [impute(rows) for rows in blocks]
+
+            for j, col in enumerate(columns):
+                filled = targets[:, j].copy()
+                for fills in results:
+                    if j in fills:
+                        rows, block_fills = fills[j]
+                        filled[rows] = block_fills
+                new_df[col] = pd.Series(filled, index = new_df.index)
+            return new_df
+
+        except Exception as e:
+            raise IOError(f"Failed to fill with nearest neighbours {e}")
+
 class Missing_Value_Handler():
     '''
     Main handler for different missing value fixing method
     '''
 
-    def __init__(self, strategy: MissingValueFixBase = Fill_Strategy()):
+    def __init__(self, strategy: MissingValueFixBase = None):
         '''
         Select the default missing value strategy
-        :param strategy: MissingValueFixBase
+        :param strategy: MissingValueFixBase, None builds a new Fill_Strategy() so fitted fill values are not
+                         shared between handlers
         '''
-        self._strategy = strategy
+        self._strategy = Fill_Strategy() if strategy is None else strategy
 
     def set_strategy(self, strategy: MissingValueFixBase):
         '''
@@ -206,3 +695,58 @@ class Missing_Value_Handler():
             return new_df
         except Exception as e:
             raise IOError('Failed to process missing value')
+
+    def process_batches(self, batches: Iterable[pd.DataFrame], feature: list = None) -> Iterator[pd.DataFrame]:
+        '''
+        Apply the missing value strategy to a stream of data frames, one batch at a time
+        :param batches (Iterable[pd.DataFrame]) : Target DataFrames, e.g. from Data_Loader_Handler.iter_batches()
+        :param feature (list = None): Specific columns to be processed
+        :return: Iterator[pd.DataFrame] -> cleaned DataFrames
+        '''
+        for batch in batches:
+            yield self.process(batch, feature)
+
+    def fit(self, df: pd.DataFrame, feature: list = None) -> 'Missing_Value_Handler':
+        '''
+        Learn the fill values of the Fill_Strategy once, e.g. on the training data
+        :param df (pd.DataFrame) : DataFrame to learn the fill values from
+        :param feature (list = None): Specific columns to be learnt
+        :return: Missing_Value_Handler -> the fitted handler
+        '''
+        if not isinstance(self._strategy, Fill_Strategy):
+            raise ValueError("Can not fit non-filling strategy, please switch to Fill_Strategy()")
+        self._strategy.fit(df, feature)
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Fill a DataFrame with the fill values learnt by fit()
+        :param df (pd.DataFrame) : Target DataFrame
+        :return: pd.DataFrame -> cleaned DataFrame
+        '''
+        if not isinstance(self._strategy, Fill_Strategy):
+            raise ValueError("Can not transform with non-filling strategy, please switch to Fill_Strategy()")
+        return self._strategy.transform(df)
+
+    def fit_batches(self, batches: Iterable[pd.DataFrame], feature: list = None) -> 'Missing_Value_Handler':
+        '''
+        First pass of a two pass imputation: learn the fill values of the Fill_Strategy over a stream of batches
+        :param batches (Iterable[pd.DataFrame]) : DataFrames, e.g. from Data_Loader_Handler.iter_batches()
+        :param feature (list = None): Specific columns to be learnt
+        :return: Missing_Value_Handler -> the fitted handler
+        '''
+        if not isinstance(self._strategy, Fill_Strategy):
+            raise ValueError("Can not fit non-filling strategy, please switch to Fill_Strategy()")
+        self._strategy._accumulators = None
+        for batch in batches:
+            self._strategy.partial_fit(batch, feature)
+        return self
+
+    def transform_batches(self, batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        '''
+        Second pass of a two pass imputation: fill a stream of batches with the learnt fill values
+        :param batches (Iterable[pd.DataFrame]) : DataFrames, e.g. from Data_Loader_Handler.iter_batches()
+        :return: Iterator[pd.DataFrame] -> cleaned DataFrames
+        '''
+        for batch in batches:
+            yield self.transform(batch)
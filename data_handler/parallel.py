@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def column_blocks(columns: list, workers: int) -> list:
+    '''
+    Split the columns into contiguous blocks, one per worker
+    :param columns (list): column names
+    :param workers (int): number of blocks
+    :return (list): list of column name lists, in the original order
+    '''
+    size = -(-len(columns) // max(1, workers))
+    return [columns[start:start + size] for start in range(0, len(columns), size)] if columns else []
+
+
+def map_column_blocks(function, columns: list, workers: int = None) -> list:
+    '''
+    Run a function over blocks of columns in a thread pool. The numpy and pandas column kernels release
+    the GIL, so the blocks run in parallel, and the results are put back in column order whatever block
+    finishes first, so the output does not depend on the number of workers
+    :param function: callable taking a list of columns and returning one result per column
+    :param columns (list): column names
+    :param workers (int): number of threads, None or 1 runs the function once in the calling thread
+    :return (list): one result per column, in the order of columns
+    '''
+    columns = list(columns)
+    if not workers or workers <= 1 or len(columns) <= 1:
+        return list(function(columns))
+
+    blocks = column_blocks(columns, workers)
+    with ThreadPoolExecutor(max_workers=len(blocks)) as pool:
+        block_results = list(pool.map(function, blocks))
+    return [result for results in block_results for result in results]
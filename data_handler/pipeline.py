@@ -0,0 +1,181 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from typing import Iterable, Iterator
+
+from data_handler.data_transformation import FeatureEngineeringBase
+from data_handler.missing_value_fix import MissingValueFixBase, Missing_Value_Handler
+from data_handler.merge_low_frequency import MergeLowShowBase
+
+
+class Pipeline():
+    '''
+    Chain feature engineering, missing value and low frequency merge strategies behind one transform().
+    Consecutive column local steps (column_local = True) are fused: every column runs through all of
+    them in one pass and is written back once, and independent columns run in parallel threads.
+    Other steps, e.g. Drop_Strategy which changes the rows or KNN_Strategy which reads several columns,
+    see the whole frame and split the plan into stages
+    '''
+
+    def __init__(self, steps: list, workers: int = None):
+        '''
+        :param steps (list): strategies, or (strategy, features) tuples for strategies taking the features
+                             in handle(), in the order to apply them
+        :param workers (int): number of threads running the columns of a fused stage, None runs them in the
+                              calling thread
+        '''
+        self.steps = [Pipeline._normalize_step(step) for step in steps]
+        self.workers = workers
+        self.report_ = None
+
+    @staticmethod
+    def _normalize_step(step) -> tuple:
+        '''
+        Unpack a step into (strategy, features)
+        :param step: strategy or (strategy, features) tuple
+        :return (tuple): strategy and features, None when not given
+        '''
+        strategy, features = step if isinstance(step, tuple) else (step, None)
+        if isinstance(strategy, Missing_Value_Handler):
+            strategy = strategy._strategy
+        if not isinstance(strategy, (FeatureEngineeringBase, MissingValueFixBase, MergeLowShowBase)):
+            raise ValueError(f"Unsupported pipeline step {type(strategy).__name__}")
+        return strategy, features
+
+    def plan(self) -> list:
+        '''
+        Group the steps into stages, consecutive column local steps share a fused stage
+        :return (list): list of (kind, [step positions]) with kind 'fused' or 'frame'
+        '''
+        stages = []
+        for position, (strategy, _) in enumerate(self.steps):
+            kind = 'fused' if strategy.column_local else 'frame'
+            if kind == 'fused' and stages and stages[-1][0] == 'fused':
+                stages[-1][1].append(position)
+            else:
+                stages.append((kind, [position]))
+        return stages
+
+    @staticmethod
+    def run_step(strategy, df: pd.DataFrame, features: list = None) -> pd.DataFrame:
+        '''
+        Apply one strategy to the whole frame, whatever its method is called: transform() for feature
+        engineering and fitted strategies, handle() otherwise
+        :param strategy: FeatureEngineeringBase, MissingValueFixBase or MergeLowShowBase
+        :param df (pd.DataFrame): Target dataframe
+        :param features (list[str]): features given to handle()
+        :return (pd.DataFrame): Transformed dataframe
+        '''
+        if isinstance(strategy, FeatureEngineeringBase):
+            return strategy.transform(df)
+        fitted = getattr(strategy, 'statistics_', None) is not None or getattr(strategy, 'vocabulary_', None) is not None
+        if isinstance(strategy, MergeLowShowBase):
+            # handle() of the merge strategies writes into the given frame
+            df = df.copy(deep=False)
+            return strategy.transform(df, features) if fitted else strategy.handle(df, features)
+        return strategy.transform(df) if fitted else strategy.handle(df, features)
+
+    def _run_column(self, series: pd.Series, positions: list, inplace_positions: set) -> tuple:
+        '''
+        Run one column through the fused steps that target it
+        :param series (pd.Series): Target column
+        :param positions (list): step positions targeting the column, in order
+        :param inplace_positions (set): positions of the inplace steps that still write into the given frame
+        :return (tuple): transformed column, column after the last of those inplace steps (None when no
+                         such step targets the column) and dict of step position to seconds
+        '''
+        seconds = {}
+        inplace_series = None
+        for position in positions:
+            start = time.perf_counter()
+            series = self.steps[position][0].transform_column(series)
+            seconds[position] = time.perf_counter() - start
+            if position in inplace_positions:
+                inplace_series = series
+        return series, inplace_series, seconds
+
+    def _run_fused(self, df: pd.DataFrame, positions: list, report: list) -> pd.DataFrame:
+        '''
+        Run a fused stage: each column goes through its steps in one pass and is written back once.
+        The inplace flags are honoured like running the steps one by one: the inplace steps before the
+        first non inplace step write into the given frame, and the given frame is returned when every
+        step is inplace, a shallow copy otherwise
+        :param df (pd.DataFrame): Target dataframe
+        :param positions (list): step positions of the stage
+        :param report (list): timing rows, appended in place
+        :return (pd.DataFrame): Transformed dataframe
+        '''
+        column_steps = {}
+        for position in positions:
+            strategy, features = self.steps[position]
+            for col in strategy.target_columns(df, features):
+                if col not in df.columns:
+                    raise ValueError(f"Column {col} of step {position} is not in the dataframe")
+                column_steps.setdefault(col, []).append(position)
+
+        inplace_positions = set()
+        for position in positions:
+            if not getattr(self.steps[position][0], 'inplace', False):
+                break
+            inplace_positions.add(position)
+
+        columns = list(column_steps)
+        tasks = [(df[col], column_steps[col], inplace_positions) for col in columns]
+        if self.workers and self.workers > 1 and len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(lambda task: self._run_column(*task), tasks))
+        else:
+            results = [self._run_column(*task) for task in tasks]
+
+        for (original, _, _), col, (_, inplace_series, _) in zip(tasks, columns, results):
+            if inplace_series is not None and inplace_series is not original:
+                df[col] = inplace_series
+
+        new_df = df if len(inplace_positions) == len(positions) else df.copy(deep=False)
+        step_seconds = dict.fromkeys(positions, 0.0)
+        step_columns = dict.fromkeys(positions, 0)
+        for (original, _, _), col, (series, inplace_series, seconds) in zip(tasks, columns, results):
+            if series is not original and series is not inplace_series:
+                new_df[col] = series
+            for position, value in seconds.items():
+                step_seconds[position] += value
+                step_columns[position] += 1
+
+        for position in positions:
+            report.append({'step': position, 'strategy': type(self.steps[position][0]).__name__,
+                           'stage': 'fused', 'columns': step_columns[position], 'seconds': step_seconds[position]})
+        return new_df
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Apply every step in order, the given dataframe is left unchanged unless a step is inplace.
+        The timing of every step is kept in report_
+        :param df (pd.DataFrame): Target dataframe
+        :return (pd.DataFrame): Transformed dataframe
+        '''
+        print("Pipeline starts............")
+        report = []
+        for kind, positions in self.plan():
+            if kind == 'fused':
+                df = self._run_fused(df, positions, report)
+                continue
+            strategy, features = self.steps[positions[0]]
+            start = time.perf_counter()
+            df = Pipeline.run_step(strategy, df, features)
+            report.append({'step': positions[0], 'strategy': type(strategy).__name__, 'stage': 'frame',
+                           'columns': df.shape[1], 'seconds': time.perf_counter() - start})
+
+        self.report_ = pd.DataFrame(report, columns=['step', 'strategy', 'stage', 'columns', 'seconds'])
+        print("Pipeline finished")
+        return df
+
+    def transform_batches(self, batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        '''
+        Apply the pipeline to a stream of data frames, one batch at a time. Fit the strategies first
+        so every batch is transformed with the same statistics
+        :param batches (Iterable[pd.DataFrame]): Target dataframes, e.g. from Data_Loader_Handler.iter_batches()
+        :return (Iterator[pd.DataFrame]): Transformed dataframes
+        '''
+        for batch in batches:
+            yield self.transform(batch)
@@ -0,0 +1,353 @@
+import pandas as pd
+import numpy as np
+
+
+class RunningMoments():
+    '''
+    Exact streaming count, mean, variance, min and max (Welford / Chan et al. update),
+    two accumulators over different chunks can be merged
+    '''
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values) -> 'RunningMoments':
+        '''
+        Add a chunk of values, missing values are ignored
+        :param values (array-like): numeric values
+        :return (RunningMoments): self
+        '''
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        chunk = RunningMoments()
+        chunk.count = len(values)
+        chunk.mean = values.mean()
+        chunk.m2 = ((values - chunk.mean) ** 2).sum()
+        chunk.min = values.min()
+        chunk.max = values.max()
+        return self.merge(chunk)
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        '''
+        Combine the moments of another accumulator into this one
+        :param other (RunningMoments): accumulator over other values
+        :return (RunningMoments): self
+        '''
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self, ddof: int = 1) -> float:
+        '''
+        :param ddof (int): delta degrees of freedom, 1 gives the sample variance like pandas
+        :return (float): variance of the values seen so far
+        '''
+        if self.count - ddof <= 0:
+            return np.nan
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 1) -> float:
+        '''
+        :param ddof (int): delta degrees of freedom, 1 gives the sample standard deviation like pandas
+        :return (float): standard deviation of the values seen so far
+        '''
+        return np.sqrt(self.variance(ddof))
+
+
+class QuantileSketch():
+    '''
+    Mergeable approximate quantile sketch following the KLL design: a stack of compactors where
+    items on level h stand for 2**h values. A full level is sorted and every other item is
+    promoted, so memory stays around O(k log(n / k)) while the rank error is about O(1 / k)
+    '''
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        '''
+        :param k (int): size of the top compactor, larger k gives smaller error
+        :param seed (int): seed of the random offsets used when compacting
+        '''
+        self.k = k
+        self.count = 0
+        self.compactors = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        height = len(self.compactors)
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (height - level - 1))))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                items = np.sort(items)
+                leftover, items = (items[:1], items[1:]) if len(items) % 2 else (items[:0], items)
+                promoted = items[self._rng.integers(2)::2]
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+                self.compactors[level] = leftover
+            level += 1
+
+    def update(self, values) -> 'QuantileSketch':
+        '''
+        Add a chunk of values, missing values are ignored
+        :param values (array-like): numeric values
+        :return (QuantileSketch): self
+        '''
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        '''
+        Combine another sketch into this one, e.g. sketches built by different workers
+        :param other (QuantileSketch): sketch over other values
+        :return (QuantileSketch): self
+        '''
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, qs) -> np.ndarray:
+        '''
+        Estimate several quantiles at once
+        :param qs (array-like): quantiles between 0 and 1
+        :return (np.ndarray): estimated values, nan when the sketch is empty
+        '''
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([np.full(len(c), 2.0 ** level) for level, c in enumerate(self.compactors)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def quantile(self, q: float) -> float:
+        '''
+        :param q (float): quantile between 0 and 1
+        :return (float): estimated value
+        '''
+        return float(self.quantiles([q])[0])
+
+
+class SpaceSaving():
+    '''
+    Mergeable heavy hitter summary in the Space-Saving style: at most `capacity` values are tracked,
+    a value that enters the summary inherits the smallest tracked count as possible error, so counts
+    are upper bounds and every value with frequency above total / capacity is kept
+    '''
+
+    def __init__(self, capacity: int = 1000):
+        '''
+        :param capacity (int): maximum number of tracked values
+        '''
+        self.capacity = capacity
+        self.total = 0
+        self.counts = pd.Series(dtype=float)
+        self.errors = pd.Series(dtype=float)
+
+    def _floor(self) -> float:
+        return float(self.counts.min()) if len(self.counts) >= self.capacity else 0.0
+
+    def _combine(self, counts: pd.Series, errors: pd.Series, other_floor: float) -> None:
+        own_floor = self._floor()
+        index = self.counts.index.union(counts.index, sort=False)
+        new_counts = self.counts.reindex(index, fill_value=own_floor) + counts.reindex(index, fill_value=other_floor)
+        new_errors = self.errors.reindex(index, fill_value=own_floor) + errors.reindex(index, fill_value=other_floor)
+        keep = new_counts.nlargest(self.capacity, keep='first').index
+        self.counts = new_counts[keep]
+        self.errors = new_errors[keep]
+
+    def update(self, values) -> 'SpaceSaving':
+        '''
+        Add a chunk of values, missing values are ignored
+        :param values (array-like): hashable values
+        :return (SpaceSaving): self
+        '''
+        chunk_counts = pd.Series(values).value_counts().astype(float)
+        self.total += int(chunk_counts.sum())
+        self._combine(chunk_counts, pd.Series(0.0, index=chunk_counts.index), 0.0)
+        return self
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        '''
+        Combine another summary into this one
+        :param other (SpaceSaving): summary over other values
+        :return (SpaceSaving): self
+        '''
+        self.total += other.total
+        self._combine(other.counts, other.errors, other._floor())
+        return self
+
+    def top(self, n: int = 1) -> pd.Series:
+        '''
+        :param n (int): number of values
+        :return (pd.Series): the n most frequent values and their estimated counts
+        '''
+        return self.counts.nlargest(n, keep='first')
+
+
+class CountMinSketch():
+    '''
+    Mergeable approximate frequency table: depth rows of width counters indexed by independent hashes.
+    Estimates never undercount and overcount by at most epsilon * total with probability 1 - delta,
+    while memory is fixed whatever the number of distinct values
+    '''
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01, seed: int = 0):
+        '''
+        :param epsilon (float): error bound as a share of the total count
+        :param delta (float): probability of exceeding the error bound
+        :param seed (int): seed of the hash functions, sketches are only mergeable with the same seed
+        '''
+        self.epsilon = epsilon
+        self.delta = delta
+        self.seed = seed
+        self.width = int(np.ceil(np.e / epsilon))
+        self.depth = int(np.ceil(np.log(1 / delta)))
+        self.total = 0
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(1, 2 ** 63, size=self.depth, dtype=np.uint64) | np.uint64(1)
+        self._offsets = rng.integers(0, 2 ** 63, size=self.depth, dtype=np.uint64)
+
+    def _buckets(self, values: pd.Series) -> np.ndarray:
+        # numeric values are hashed as floats so that 20 and 20.0 (an int chunk and a chunk with a
+        # missing value) share their buckets
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            values = values.astype(float)
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        with np.errstate(over='ignore'):
+            mixed = hashes[None, :] * self._multipliers[:, None] + self._offsets[:, None]
+        return (mixed >> np.uint64(17)) % np.uint64(self.width)
+
+    def update(self, values) -> 'CountMinSketch':
+        '''
+        Add a chunk of values, missing values are ignored
+        :param values (array-like): hashable values
+        :return (CountMinSketch): self
+        '''
+        values = pd.Series(values).dropna()
+        if len(values) == 0:
+            return self
+        self.total += len(values)
+        for row, buckets in enumerate(self._buckets(values)):
+            self.table[row] += np.bincount(buckets.astype(np.intp), minlength=self.width)
+        return self
+
+    def estimate(self, values) -> np.ndarray:
+        '''
+        Estimate the counts of several values at once
+        :param values (array-like): hashable values
+        :return (np.ndarray): estimated counts, upper bounds of the true counts
+        '''
+        values = pd.Series(values)
+        if len(values) == 0:
+            return np.zeros(0, dtype=np.int64)
+        buckets = self._buckets(values).astype(np.intp)
+        return np.take_along_axis(self.table, buckets, axis=1).min(axis=0)
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        '''
+        Combine another sketch built with the same epsilon, delta and seed into this one
+        :param other (CountMinSketch): sketch over other values
+        :return (CountMinSketch): self
+        '''
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Only sketches with the same epsilon, delta and seed can be merged")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+
+class HyperLogLog():
+    '''
+    Mergeable distinct count estimate: every value is hashed, the first `precision` bits pick a register
+    and the register keeps the longest run of leading zeros seen in the other bits. The relative error
+    is about 1.04 / sqrt(2 ** precision), with linear counting for small cardinalities
+    '''
+
+    def __init__(self, precision: int = 12):
+        '''
+        :param precision (int): number of register bits, between 4 and 18
+        '''
+        if not 4 <= precision <= 18:
+            raise ValueError("precision should be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def update(self, values) -> 'HyperLogLog':
+        '''
+        Add a chunk of values, missing values are ignored. Numeric values are hashed as floats so
+        that 1 and 1.0 from batches with different dtypes count once
+        :param values (array-like): hashable values
+        :return (HyperLogLog): self
+        '''
+        values = pd.Series(values).dropna()
+        if len(values) == 0:
+            return self
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            values = values.astype(float)
+
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        rest_bits = 64 - self.precision
+        registers = (hashes >> np.uint64(rest_bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        # rest is below 2 ** 60, its bit length is the exponent of the float (exact for the leading bit)
+        bit_length = np.frexp(rest.astype(float))[1]
+        ranks = (rest_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, registers, ranks)
+        return self
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        '''
+        Combine another estimate with the same precision into this one
+        :param other (HyperLogLog): estimate over other values
+        :return (HyperLogLog): self
+        '''
+        if self.precision != other.precision:
+            raise ValueError("Only estimates with the same precision can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        '''
+        :return (int): estimated number of distinct values
+        '''
+        size = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / size) * size ** 2 / np.power(2.0, -self.registers.astype(float)).sum()
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * np.log(size / zeros)
+        return int(round(estimate))
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+
+class DataCache():
+    '''
+    On-disk cache of parsed data frames stored in a columnar binary format (Parquet or Feather).
+    Entries are keyed by the source path, size, modification time, content hash and loader settings,
+    and the least recently used entries are evicted once the cache grows above max_bytes
+    '''
+
+    FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+
+    def __init__(self, cache_dir: str = '.data_cache', max_bytes: int = 2 * 1024 ** 3,
+                 file_format: str = 'parquet', hash_content: bool = True):
+        '''
+        :param cache_dir: (str) directory holding the cached frames and the index
+        :param max_bytes: (int) upper bound of the total size of the cached frames
+        :param file_format: (str) 'parquet' or 'feather'
+        :param hash_content: (bool) include a hash of the file content in the key, turn off to key on size and mtime only
+        '''
+        if file_format not in DataCache.FORMATS:
+            raise ValueError(f"file_format should be one of {list(DataCache.FORMATS)}")
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.file_format = file_format
+        self.hash_content = hash_content
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index_path = os.path.join(cache_dir, 'index.json')
+
+    @staticmethod
+    def content_hash(path: str, block_size: int = 1024 ** 2) -> str:
+        '''
+        Hash the content of the file block by block
+
+        :param path: (str) file path of the source
+        :param block_size: (int) number of bytes read at a time
+
+        :return: hex digest of the file content
+        '''
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def make_key(self, path: str, loader=None, options: dict = None) -> str:
+        '''
+        Build the cache key of a source file
+
+        :param path: (str) file path of the source
+        :param loader: the DataLoadBasic used to parse the source, its cache_settings() are part of the key
+        :param options: (dict) other load arguments that change the result, e.g. the selected columns
+
+        :return: (str) cache key
+        '''
+        stat = os.stat(path)
+        parts = {'path': os.path.abspath(path),
+                 'size': stat.st_size,
+                 'mtime': stat.st_mtime_ns,
+                 'content': DataCache.content_hash(path) if self.hash_content else None,
+                 'loader': DataCache._describe_loader(loader),
+                 'options': options}
+        return hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _describe_loader(loader) -> str:
+        '''
+        Describe the loader class and its constructor settings, so state filled by a load
+        (an inferred schema, a member report) does not change the key
+
+        :param loader: the DataLoadBasic used to parse the source
+
+        :return: (str) description of the loader
+        '''
+        if loader is None:
+            return ''
+        settings = loader.cache_settings() or {}
+        return f'{type(loader).__name__}{json.dumps(settings, sort_keys=True, default=str)}'
+
+    def get(self, key: str):
+        '''
+        Load a cached frame and mark it as recently used
+
+        :param key: (str) cache key from make_key()
+
+        :return: pd.DataFrame or None when the key is not cached
+        '''
+        index = self._read_index()
+        entry = index.get(key)
+        if entry is None:
+            return None
+
+        file_path = os.path.join(self.cache_dir, entry['file'])
+        try:
+            if self.file_format == 'parquet':
+                df = pd.read_parquet(file_path)
+            else:
+                df = pd.read_feather(file_path)
+        except Exception:
+            index.pop(key)
+            self._write_index(index)
+            return None
+
+        entry['last_access'] = time.time()
+        self._write_index(index)
+        return df
+
+    def put(self, key: str, df: pd.DataFrame, source: str = None) -> bool:
+        '''
+        Store a frame in the cache and evict the least recently used entries above max_bytes
+
+        :param key: (str) cache key from make_key()
+        :param df: (pd.DataFrame) parsed frame to be cached
+        :param source: (str) file path of the source, used by invalidate()
+
+        :return: True if the frame is cached, False if the format can not store it
+        '''
+        file_name = key + DataCache.FORMATS[self.file_format]
+        file_path = os.path.join(self.cache_dir, file_name)
+        try:
+            if self.file_format == 'parquet':
+                df.to_parquet(file_path)
+            else:
+                df.reset_index(drop=True).to_feather(file_path)
+        except Exception as e:
+            print(f"Frame can not be cached as {self.file_format}: {e}")
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            return False
+
+        index = self._read_index()
+        index[key] = {'file': file_name,
+                      'source': os.path.abspath(source) if source else None,
+                      'bytes': os.path.getsize(file_path),
+                      'last_access': time.time()}
+        self._evict(index)
+        self._write_index(index)
+        return key in index
+
+    def invalidate(self, path: str = None) -> int:
+        '''
+        Remove the cached frames of a source file, or the whole cache when no path is given
+
+        :param path: (str) file path of the source
+
+        :return: (int) number of removed entries
+        '''
+        index = self._read_index()
+        source = os.path.abspath(path) if path else None
+        removed = [key for key, entry in index.items() if source is None or entry['source'] == source]
+        for key in removed:
+            self._remove_file(index.pop(key))
+        self._write_index(index)
+        return len(removed)
+
+    def size(self) -> int:
+        '''
+        Total size of the cached frames
+
+        :return: (int) number of bytes
+        '''
+        return sum(entry['bytes'] for entry in self._read_index().values())
+
+    def _evict(self, index: dict) -> None:
+        '''
+        Drop the least recently used entries until the cache fits in max_bytes
+
+        :param index: (dict) cache index, changed in place
+
+        :return: None
+        '''
+        total = sum(entry['bytes'] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            entry = index.pop(key)
+            total -= entry['bytes']
+            self._remove_file(entry)
+
+    def _remove_file(self, entry: dict) -> None:
+        file_path = os.path.join(self.cache_dir, entry['file'])
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def _read_index(self) -> dict:
+        if not os.path.exists(self._index_path):
+            return {}
+        with open(self._index_path) as f:
+            return json.load(f)
+
+    def _write_index(self, index: dict) -> None:
+        temp_path = self._index_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(temp_path, self._index_path)
@@ -1,10 +1,21 @@
-import tempfile
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import fnmatch
+import glob
+import io
+import itertools
+import json
+import re
 import zipfile
-from tempfile import tempdir
 
+import numpy as np
 import pandas as pd
 import os
+import time
+from typing import Iterator
+
+from load_data.data_cache import DataCache
 
 
 
@@ -15,23 +26,236 @@ class DataLoadBasic(ABC):
     """
 
     @abstractmethod
-    def load_data(self, path: str) -> pd.DataFrame:
+    def load_data(self, path: str, columns: list = None, row_filter: str = None) -> pd.DataFrame:
         """
         Abstract method for loading a dataframe from a file.
 
         Args:
             path (str): File path of the data to load.
+            columns (list): Columns to keep, None keeps every column.
+            row_filter (str): DataFrame.query expression selecting the rows to keep.
 
         Returns:
             pd.DataFrame: The loaded dataframe.
         """
         pass
 
+    def iter_batches(self, path: str, chunk_rows: int = 100_000, columns: list = None,
+                     row_filter: str = None) -> Iterator[pd.DataFrame]:
+        """
+        Yield the data as a sequence of dataframes. Formats that can not be read
+        incrementally fall back to a single batch holding the whole file.
+
+        Args:
+            path (str): File path of the data to load.
+            chunk_rows (int): Maximum number of rows in each batch.
+            columns (list): Columns to keep, None keeps every column.
+            row_filter (str): DataFrame.query expression selecting the rows to keep.
+
+        Returns:
+            Iterator[pd.DataFrame]: The loaded batches.
+        """
+        yield self.load_data(path, **pushdown_options(columns, row_filter))
+
+    def cache_settings(self) -> dict:
+        """
+        Constructor settings that change the loaded frame, used by DataCache to key the cached frames.
+        State filled by a load (e.g. an inferred schema or a member report) must be left out, otherwise
+        the first load is stored under a key that is never looked up again.
+
+        Returns:
+            dict: Setting name to value, None (the default) loads without the cache.
+        """
+        return None
+
+    def cache_hit(self) -> None:
+        """
+        Called instead of load_data() when the frame is served from the cache, loaders reset the
+        state describing their last parse here.
+        """
+        pass
+
+def pushdown_options(columns: list = None, row_filter: str = None) -> dict:
+    '''
+    Keyword arguments for load_data() and iter_batches() holding only the requested pushdowns,
+    so loaders written before the pushdown, e.g. load_data(self, path), keep working without them
+
+    :param columns: (list) columns to keep, None keeps every column
+    :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+    :return: (dict) the given columns and row_filter
+    '''
+    options = {}
+    if columns is not None:
+        options['columns'] = columns
+    if row_filter:
+        options['row_filter'] = row_filter
+    return options
+
+def column_selector(columns: list = None, row_filter: str = None):
+    '''
+    Build the usecols argument for the pandas readers, so only the requested columns and the
+    columns referenced by the row filter are parsed
+
+    :param columns: (list) columns to keep, None keeps every column
+    :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+    :return: callable accepted as usecols, or None to parse every column
+    '''
+    if columns is None:
+        return None
+
+    wanted = set(columns)
+    if row_filter:
+        wanted.update(re.findall(r'`([^`]+)`', row_filter))
+        wanted.update(re.findall(r'[A-Za-z_][A-Za-z0-9_]*', re.sub(r'`[^`]+`', ' ', row_filter)))
+    return lambda column: column in wanted
+
+def select_rows(df: pd.DataFrame, columns: list = None, row_filter: str = None) -> pd.DataFrame:
+    '''
+    Apply the row filter to a parsed frame or chunk and keep the requested columns in the requested order
+
+    :param df: (pd.DataFrame) parsed frame or chunk
+    :param columns: (list) columns to keep, None keeps every column
+    :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+    :return: (pd.DataFrame) selected frame
+    '''
+    if row_filter:
+        df = df.query(row_filter)
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+def read_csv_selected(source, columns: list = None, row_filter: str = None, chunk_rows: int = 100_000,
+                      **options) -> pd.DataFrame:
+    '''
+    Read a csv source with column projection and row filtering applied while parsing: unused columns
+    are skipped by the parser and the filter runs on every chunk, so only the kept rows accumulate
+
+    :param source: file path or file-like object of the csv
+    :param columns: (list) columns to keep, None keeps every column
+    :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+    :param chunk_rows: (int) number of rows parsed at a time when filtering
+    :param options: other keyword arguments for pd.read_csv
+
+    :return: (pd.DataFrame) selected frame
+    '''
+    usecols = column_selector(columns, row_filter)
+    if not row_filter:
+        return select_rows(pd.read_csv(source, usecols=usecols, **options), columns)
+
+    with pd.read_csv(source, usecols=usecols, chunksize=chunk_rows, **options) as reader:
+        chunks = [select_rows(chunk, columns, row_filter) for chunk in reader]
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+
+def recommend_dtype(series: pd.Series, category_ratio: float = 0.5) -> str:
+    '''
+    Pick the most compact dtype that holds every value of the column without loss:
+    low cardinality text becomes category, integers get the narrowest width, and floats
+    that survive the round trip become float32. Columns with missing values stay float,
+    a nullable integer column would reject the non integral fill values of Fill_Strategy
+
+    :param series: (pd.Series) column to inspect
+    :param category_ratio: (float) maximum share of distinct values for a text column to become category
+
+    :return: (str) recommended dtype
+    '''
+
+    values = series.dropna()
+    if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(series):
+        return str(series.dtype)
+
+    if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        if len(values) and values.nunique() <= category_ratio * len(values):
+            return 'category'
+        return str(series.dtype)
+
+    if not pd.api.types.is_numeric_dtype(series) or len(values) == 0:
+        return str(series.dtype)
+
+    array = values.to_numpy()
+    if series.hasnans or (pd.api.types.is_float_dtype(series) and not np.array_equal(np.floor(array), array)):
+        if np.array_equal(array.astype(np.float32).astype(array.dtype), array):
+            return 'float32'
+        return str(series.dtype)
+
+    low, high = array.min(), array.max()
+    candidates = ('uint8', 'uint16', 'uint32', 'uint64') if low >= 0 else ('int8', 'int16', 'int32', 'int64')
+    for candidate in candidates:
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            break
+    return candidate
+
+def apply_schema(df: pd.DataFrame, schema: dict, category_ratio: float = 0.5) -> pd.DataFrame:
+    '''
+    Cast the columns of a frame to the dtypes of a schema. Numeric columns whose values do
+    not fit the schema dtype (e.g. the schema was inferred from a sample) fall back to the
+    dtype recommended for the full column. Category columns get the categories of the schema,
+    so every batch of a stream shares one dtype and concatenates as category; a column holding
+    values outside them falls back the same way and concatenates with the other batches as object
+
+    :param df: (pd.DataFrame) frame to be cast, changed in place
+    :param schema: (dict) column name to dtype or pd.CategoricalDtype
+    :param category_ratio: (float) passed to recommend_dtype() for the fallback
+
+    :return: (pd.DataFrame) the cast frame
+    '''
+
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            if df[column].dropna().isin(dtype.categories).all():
+                df[column] = df[column].astype(dtype)
+            else:
+                df[column] = df[column].astype(recommend_dtype(df[column], category_ratio))
+            continue
+        if str(df[column].dtype) == dtype:
+            continue
+        try:
+            if dtype != 'category' and pd.api.types.is_numeric_dtype(df[column]):
+                values = df[column].dropna().to_numpy()
+                cast = values.astype(pd.api.types.pandas_dtype(dtype).type)
+                if not np.array_equal(cast, values):
+                    dtype = recommend_dtype(df[column], category_ratio)
+            df[column] = df[column].astype(dtype)
+        except (TypeError, ValueError, OverflowError):
+            df[column] = df[column].astype(recommend_dtype(df[column], category_ratio))
+    return df
+
 class CSVLoader(DataLoadBasic):
     '''
     Data Loader for CSV files.
     '''
 
+    def __init__(self, schema: dict = None, infer_schema: bool = False, sample_rows: int = 10_000,
+                 category_ratio: float = 0.5):
+        '''
+        :param schema: (dict) column name to dtype or pd.CategoricalDtype, e.g. from CSVLoader.load_schema(),
+                       applied while loading
+        :param infer_schema: (bool) infer a compact schema from the first sample_rows rows when no schema is given
+        :param sample_rows: (int) number of rows sampled by the schema inference
+        :param category_ratio: (float) maximum share of distinct values for a text column to become category
+        '''
+        self.schema = schema
+        self.infer_schema = infer_schema
+        self.sample_rows = sample_rows
+        self.category_ratio = category_ratio
+        self._schema_inferred = False
+
+    def cache_settings(self) -> dict:
+        '''
+        Settings keying the cached frames, a schema inferred by a previous load is left out
+
+        :return: (dict) setting name to value
+        '''
+        schema = None if self._schema_inferred else self.schema
+        return {'schema': CSVLoader._serialize_schema(schema) if schema else schema,
+                'infer_schema': self.infer_schema, 'sample_rows': self.sample_rows,
+                'category_ratio': self.category_ratio}
+
     @staticmethod
     def file_validator(file_path: str) -> bool:
         '''
@@ -43,11 +267,97 @@ class CSVLoader(DataLoadBasic):
         '''
         return file_path.lower().endswith('.csv')
 
-    def load_data(self, path: str) -> pd.DataFrame:
+    @staticmethod
+    def infer_schema_from_sample(path: str, sample_rows: int = 10_000, category_ratio: float = 0.5) -> dict:
+        '''
+        Sample the head of the csv file and recommend a compact dtype for every column. Category
+        columns keep the values seen in the sample as a pd.CategoricalDtype
+
+        :param path: (str) file path of the csv file
+        :param sample_rows: (int) number of rows to sample
+        :param category_ratio: (float) maximum share of distinct values for a text column to become category
+
+        :return: (dict) column name to dtype or pd.CategoricalDtype
+        '''
+        sample = pd.read_csv(path, nrows=sample_rows)
+        schema = {}
+        for column in sample.columns:
+            dtype = recommend_dtype(sample[column], category_ratio)
+            if dtype == 'category':
+                dtype = pd.CategoricalDtype(sorted(sample[column].dropna().unique()))
+            schema[column] = dtype
+        return schema
+
+    @staticmethod
+    def save_schema(schema: dict, path: str) -> None:
+        '''
+        Save a schema as json so later loads can reuse it, the categories of a pd.CategoricalDtype
+        are saved with it
+
+        :param schema: (dict) column name to dtype or pd.CategoricalDtype
+        :param path: (str) file path of the json file
+
+        :return: None
+        '''
+        with open(path, 'w') as f:
+            json.dump(CSVLoader._serialize_schema(schema), f, indent=2)
+
+    @staticmethod
+    def _serialize_schema(schema: dict) -> dict:
+        '''
+        Json friendly copy of a schema, a pd.CategoricalDtype becomes its categories
+
+        :param schema: (dict) column name to dtype or pd.CategoricalDtype
+
+        :return: (dict) column name to dtype or {'dtype': 'category', 'categories': [...]}
+        '''
+        return {column: {'dtype': 'category', 'categories': dtype.categories.to_list()}
+                if isinstance(dtype, pd.CategoricalDtype) else dtype for column, dtype in schema.items()}
+
+    @staticmethod
+    def load_schema(path: str) -> dict:
+        '''
+        Load a schema saved by save_schema()
+
+        :param path: (str) file path of the json file
+
+        :return: (dict) column name to dtype or pd.CategoricalDtype
+        '''
+        with open(path) as f:
+            schema = json.load(f)
+        return {column: pd.CategoricalDtype(dtype['categories']) if isinstance(dtype, dict) else dtype
+                for column, dtype in schema.items()}
+
+    def _resolve_schema(self, path: str) -> dict:
+        '''
+        Return the schema to load with, inferring it once if requested
+
+        :param path: (str) file path of the csv file
+
+        :return: (dict) column name to dtype, or None
+        '''
+        if self.schema is None and self.infer_schema:
+            self.schema = CSVLoader.infer_schema_from_sample(path, self.sample_rows, self.category_ratio)
+            self._schema_inferred = True
+        return self.schema
+
+    @staticmethod
+    def _read_options(schema: dict) -> dict:
+        '''
+        Text columns are parsed straight into category, numeric columns and the categories of
+        the schema are cast after parsing once the values are known to fit
+        '''
+        if not schema:
+            return {}
+        return {'dtype': {column: 'category' for column, dtype in schema.items() if str(dtype) == 'category'}}
+
+    def load_data(self, path: str, columns: list = None, row_filter: str = None) -> pd.DataFrame:
         '''
         Function in the DataLoadBasic to load data and return the dataframe
 
         :param path: (str) file path to be processed, should be csv file
+        :param columns: (list) columns to keep, None keeps every column
+        :param row_filter: (str) DataFrame.query expression selecting the rows to keep
 
         :return: processed data frame
         '''
@@ -56,15 +366,93 @@ class CSVLoader(DataLoadBasic):
             raise ValueError("The input file should be csv file")
 
         try:
-            return pd.read_csv(path)
+            schema = self._resolve_schema(path)
+            df = read_csv_selected(path, columns, row_filter, **CSVLoader._read_options(schema))
+            if schema:
+                df = apply_schema(df, schema, self.category_ratio)
+            return df
+        except Exception as e:
+            raise IOError(f"failed to read the csv file {e}")
+
+    def iter_batches(self, path: str, chunk_rows: int = 100_000, columns: list = None,
+                     row_filter: str = None) -> Iterator[pd.DataFrame]:
+        '''
+        Stream the csv file as data frames of at most chunk_rows rows, so only one batch
+        is held in memory at a time
+
+        :param path: (str) file path to be processed, should be csv file
+        :param chunk_rows: (int) maximum number of rows in each batch
+        :param columns: (list) columns to keep, None keeps every column
+        :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+        :return: iterator of data frames
+        '''
+
+        if not CSVLoader.file_validator(path):
+            raise ValueError("The input file should be csv file")
+
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows should be a positive integer")
+
+        try:
+            schema = self._resolve_schema(path)
+            with pd.read_csv(path, chunksize=chunk_rows, usecols=column_selector(columns, row_filter),
+                             **CSVLoader._read_options(schema)) as reader:
+                for chunk in reader:
+                    chunk = select_rows(chunk, columns, row_filter)
+                    yield apply_schema(chunk, schema, self.category_ratio) if schema else chunk
         except Exception as e:
             raise IOError(f"failed to read the csv file {e}")
 
+def _read_excel_sheet(path: str, sheet_name: str, columns: list = None, row_filter: str = None) -> pd.DataFrame:
+    '''
+    Worker function for ExcelLoader, parses a single sheet of the workbook
+
+    :param path: (str) file path of the workbook
+    :param sheet_name: (str) sheet to be parsed
+    :param columns: (list) columns to keep, None keeps every column
+    :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+    :return: Data Frame of the sheet
+    '''
+    df = pd.read_excel(path, sheet_name=sheet_name, usecols=column_selector(columns, row_filter))
+    return select_rows(df, columns, row_filter)
+
+def _read_zip_member(path: str, name: str, columns: list = None, row_filter: str = None) -> tuple:
+    '''
+    Worker function for ZipLoader, opens the archive and parses a single member
+
+    :param path: (str) file path of the zip file
+    :param name: (str) member name
+    :param columns: (list) columns to keep, None keeps every column
+    :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+    :return: (Data Frame of the member, seconds spent parsing)
+    '''
+    start = time.perf_counter()
+    with zipfile.ZipFile(path, 'r') as zip_ref:
+        df = ZipLoader.read_member(zip_ref, name, columns, row_filter)
+    return df, time.perf_counter() - start
+
 class ExcelLoader(DataLoadBasic):
     '''
     Class used to load excel file
     '''
 
+    def __init__(self, workers: int = None):
+        '''
+        :param workers: (int) number of processes used to parse the sheets, None or 1 parses them in this process
+        '''
+        self.workers = workers
+
+    def cache_settings(self) -> dict:
+        '''
+        Settings keying the cached frames, the number of workers does not change the frame
+
+        :return: (dict) setting name to value
+        '''
+        return {}
+
     @staticmethod
     def file_validator(file_path: str) -> bool:
         '''
@@ -78,11 +466,13 @@ class ExcelLoader(DataLoadBasic):
         valid_extensions = ('.xlsx', '.xls')
         return file_path.lower().endswith(valid_extensions)
 
-    def load_data(self, path: str) -> pd.DataFrame:
+    def load_data(self, path: str, columns: list = None, row_filter: str = None) -> pd.DataFrame:
         '''
         Main function used to load and return the Excel file
 
         :param path: File path for the Excel to be loaded
+        :param columns: (list) columns to keep, None keeps every column
+        :param row_filter: (str) DataFrame.query expression selecting the rows to keep
 
         :return: combined_df (pd.DataFrame) containing the processed file
         '''
@@ -91,20 +481,83 @@ class ExcelLoader(DataLoadBasic):
             raise ValueError('Invalid file type: Expect Excel file')
 
         try:
-            df = pd.read_excel(path, sheet_name=None)
-            combined_df = pd.concat(df.values(), ignore_index=True)
-            return combined_df
+            if self.workers and self.workers > 1:
+                with pd.ExcelFile(path) as workbook:
+                    sheet_names = workbook.sheet_names
+                count = len(sheet_names)
+                with ProcessPoolExecutor(max_workers=min(self.workers, count)) as executor:
+                    sheets = list(executor.map(_read_excel_sheet, [path] * count, sheet_names,
+                                               [columns] * count, [row_filter] * count))
+                return pd.concat(sheets, ignore_index=True)
+
+            return ExcelLoader.read_workbook(path, columns, row_filter)
         except Exception as e:
             raise IOError(f"File can not be read {e}")
 
+    @staticmethod
+    def read_header(source, name: str) -> list:
+        '''
+        Read only the column names of every sheet, read_workbook() stacks the sheets so they must agree
+
+        :param source: file path or binary file-like object of the workbook
+        :param name: (str) name of the workbook used in the error message
+
+        :return: list of column names
+        '''
+        sheets = pd.read_excel(source, sheet_name=None, nrows=0)
+        headers = [sheet.columns.to_list() for sheet in sheets.values()]
+        if any(header != headers[0] for header in headers):
+            raise ValueError(f"Sheets inside {name} have different table format")
+        return headers[0]
+
+    @staticmethod
+    def read_workbook(source, columns: list = None, row_filter: str = None) -> pd.DataFrame:
+        '''
+        Read every sheet of a workbook and stack them into one data frame
+
+        :param source: file path or binary file-like object of the workbook
+        :param columns: (list) columns to keep, None keeps every column
+        :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+        :return: combined_df (pd.DataFrame) containing all the sheets
+        '''
+
+        df = pd.read_excel(source, sheet_name=None, usecols=column_selector(columns, row_filter))
+        combined_df = pd.concat([select_rows(sheet, columns, row_filter) for sheet in df.values()],
+                                ignore_index=True)
+        return combined_df
+
 class ZipLoader(DataLoadBasic):
     '''
-    Class used to load Zip file
+    Class used to load Zip file, members are read straight from the archive without extracting to disk
     '''
 
-    def __init__(self, file_type: str = None):
+    def __init__(self, file_type: str = None, pattern: str = None, workers: int = None):
+        '''
+        :param file_type: (str) 'csv' or 'excel' to only load one kind of member, None loads both
+        :param pattern: (str) glob pattern on the member names inside the archive, e.g. 'daily/*.csv'
+        :param workers: (int) number of processes used to parse the members, None or 1 parses them in this process
+        '''
         self.file_type = file_type
+        self.pattern = pattern
+        self.workers = workers
+        self.member_report = None
 
+    def cache_settings(self) -> dict:
+        '''
+        Settings keying the cached frames, the number of workers and the member report are left out
+
+        :return: (dict) setting name to value
+        '''
+        return {'file_type': self.file_type, 'pattern': self.pattern}
+
+    def cache_hit(self) -> None:
+        '''
+        No member is parsed for a frame served from the cache, so there is no member report
+
+        :return: None
+        '''
+        self.member_report = None
 
     @staticmethod
     def file_validator(file_path: str) -> bool:
@@ -119,11 +572,92 @@ class ZipLoader(DataLoadBasic):
 
         return file_path.lower().endswith('.zip')
 
-    def load_data(self, path: str) -> pd.DataFrame:
+    def list_members(self, zip_ref: zipfile.ZipFile) -> list:
+        '''
+        List the file members of the archive that match the glob pattern
+
+        :param zip_ref: (zipfile.ZipFile) opened archive
+
+        :return: list of member names, in archive order
+        '''
+
+        members = [info.filename for info in zip_ref.infolist() if not info.is_dir()]
+        if self.pattern:
+            members = [name for name in members if fnmatch.fnmatch(name, self.pattern)]
+        return members
+
+    def select_members(self, zip_ref: zipfile.ZipFile) -> list:
+        '''
+        Pick the csv and Excel members to load based on file_type, csv members come first
+
+        :param zip_ref: (zipfile.ZipFile) opened archive
+
+        :return: list of member names
         '''
-        This is the main function for loading the Zip file
+
+        members = self.list_members(zip_ref)
+        csv_files = [f for f in members if CSVLoader.file_validator(f)]
+        excel_file = [f for f in members if ExcelLoader.file_validator(f)]
+
+        if len(csv_files) == 0 and self.file_type == 'csv':
+            raise FileNotFoundError("No csv file found inside the zip")
+
+        if len(excel_file) == 0 and self.file_type == 'excel':
+            raise FileNotFoundError("No excel file found inside the zip")
+
+        if self.file_type == 'excel':
+            return excel_file
+        elif self.file_type == 'csv':
+            return csv_files
+        return csv_files + excel_file
+
+    @staticmethod
+    def read_header(zip_ref: zipfile.ZipFile, name: str) -> list:
+        '''
+        Read only the column names of a member, used to validate the schema before parsing
+
+        :param zip_ref: (zipfile.ZipFile) opened archive
+        :param name: (str) member name
+
+        :return: list of column names
+        '''
+
+        if CSVLoader.file_validator(name):
+            with zip_ref.open(name) as member:
+                return pd.read_csv(member, nrows=0).columns.to_list()
+
+        return ExcelLoader.read_header(io.BytesIO(zip_ref.read(name)), name)
+
+    @staticmethod
+    def read_member(zip_ref: zipfile.ZipFile, name: str, columns: list = None, row_filter: str = None) -> pd.DataFrame:
+        '''
+        Parse a single csv or Excel member of the archive
+
+        :param zip_ref: (zipfile.ZipFile) opened archive
+        :param name: (str) member name
+        :param columns: (list) columns to keep, None keeps every column
+        :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+        :return: Data Frame of the member
+        '''
+
+        if CSVLoader.file_validator(name):
+            with zip_ref.open(name) as member:
+                return read_csv_selected(member, columns, row_filter)
+
+        # workbooks are zip containers themselves and need random access,
+        # so the member is buffered in memory rather than on disk
+        return ExcelLoader.read_workbook(io.BytesIO(zip_ref.read(name)), columns, row_filter)
+
+    def load_data(self, path: str, columns: list = None, row_filter: str = None) -> pd.DataFrame:
+        '''
+        This is the main function for loading the Zip file. The headers of all the members are
+        checked before any member is parsed, and the parsed members are concatenated once.
+        Time, size and rows of every member are kept in self.member_report
 
         :param path: file path for the zip file
+        :param columns: (list) columns to keep, None keeps every column
+        :param row_filter: (str) DataFrame.query expression selecting the rows to keep
 
         :return: Data Frame
         '''
@@ -132,49 +666,204 @@ class ZipLoader(DataLoadBasic):
             raise ValueError("File must be zip file")
 
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                with zipfile.ZipFile(path, 'r') as zip_ref:
-                    zip_ref.extractall(temp_dir)
+            with zipfile.ZipFile(path, 'r') as zip_ref:
+                members = self.select_members(zip_ref)
+
+                expected_header = None
+                for name in members:
+                    header = ZipLoader.read_header(zip_ref, name)
+                    if expected_header is None:
+                        expected_header = header
+                    elif header != expected_header:
+                        raise ValueError("Files inside the zip have different table format")
+
+                if self.workers and self.workers > 1 and len(members) > 1:
+                    count = len(members)
+                    with ProcessPoolExecutor(max_workers=min(self.workers, count)) as executor:
+                        results = list(executor.map(_read_zip_member, [path] * count, members,
+                                                    [columns] * count, [row_filter] * count))
+                else:
+                    results = []
+                    for name in members:
+                        start = time.perf_counter()
+                        df = ZipLoader.read_member(zip_ref, name, columns, row_filter)
+                        results.append((df, time.perf_counter() - start))
+
+                frames = []
+                report = []
+                for name, (df, seconds) in zip(members, results):
+                    info = zip_ref.getinfo(name)
+                    report.append({'member': name,
+                                   'compressed_bytes': info.compress_size,
+                                   'bytes': info.file_size,
+                                   'rows': len(df),
+                                   'seconds': seconds})
+                    frames.append(df)
+
+            self.member_report = pd.DataFrame(report, columns=['member', 'compressed_bytes', 'bytes',
+                                                               'rows', 'seconds'])
+
+            if not frames:
+                return pd.DataFrame()
+
+            return pd.concat(frames, ignore_index= True)
 
-                extracted_file = os.listdir(temp_dir)
-                csv_files = [f for f in extracted_file if CSVLoader.file_validator(f)]
-                excel_file = [f for f in extracted_file if ExcelLoader.file_validator(f)]
+        except Exception as e:
+            raise IOError("Zip file load failed")
 
-                if len(csv_files) == 0 and self.file_type == 'csv':
-                    raise FileNotFoundError("No csv file found inside the zip")
 
-                if len(excel_file) == 0 and self.file_type == 'excel':
-                    raise FileNotFoundError("No excel file found inside the zip")
+class DirectoryLoader(DataLoadBasic):
+    '''
+    Class used to load every csv and Excel file of a directory or a glob pattern, files are read
+    concurrently by a bounded thread pool
+    '''
 
-                if self.file_type != 'excel':
-                    combined_csv = pd.DataFrame()
-                    for f in csv_files:
-                        csv_file_path = os.path.join(temp_dir, f)
-                        df = pd.read_csv(csv_file_path)
-                        combined_csv = pd.concat([combined_csv,df], ignore_index= True)
+    def __init__(self, pattern: str = '*', workers: int = 8, source_column: str = None, recursive: bool = False):
+        '''
+        :param pattern: (str) glob pattern for the file names when the path is a directory
+        :param workers: (int) maximum number of files read at the same time
+        :param source_column: (str) name of a column tagging every row with its source file, None to skip
+        :param recursive: (bool) let '**' in the pattern match sub directories
+        '''
+        self.pattern = pattern
+        self.workers = workers
+        self.source_column = source_column
+        self.recursive = recursive
 
-                if self.file_type != 'csv':
-                    combined_excel = pd.DataFrame()
-                    data_loader = ExcelLoader()
-                    for f in excel_file:
-                        excel_file_path = os.path.join(temp_dir, f)
-                        df = data_loader.load_data(excel_file_path)
-                        combined_excel = pd.concat([combined_excel, df], ignore_index= True)
+    def cache_settings(self) -> dict:
+        '''
+        Settings keying the cached frames, the number of workers does not change the frame
 
-                if (not self.file_type) and not (combined_csv.columns.equals(combined_excel.columns)):
-                    raise ValueError("Files inside the zip have different table format")
+        :return: (dict) setting name to value
+        '''
+        return {'pattern': self.pattern, 'source_column': self.source_column, 'recursive': self.recursive}
 
-                if self.file_type == 'excel':
-                    return combined_excel
-                elif self.file_type == 'csv':
-                    return combined_csv
+    @staticmethod
+    def file_validator(file_path: str) -> bool:
+        '''
+        validator to check if the path is a directory or a glob pattern
+
+        :param file_path: (str) directory or glob pattern
+
+        :return: True if the path is a directory or a glob pattern, False if not
+        '''
+        return os.path.isdir(file_path) or any(char in file_path for char in '*?[')
+
+    def list_files(self, path: str) -> list:
+        '''
+        List the csv and Excel files matching the directory or glob pattern, sorted by name
+
+        :param path: (str) directory or glob pattern
 
-                combined_table = pd.concat([combined_csv, combined_excel], ignore_index= True)
+        :return: list of file paths
+        '''
+        if os.path.isdir(path):
+            path = os.path.join(path, self.pattern)
+        files = sorted(f for f in glob.glob(path, recursive=self.recursive) if os.path.isfile(f))
+        return [f for f in files if CSVLoader.file_validator(f) or ExcelLoader.file_validator(f)]
+
+    @staticmethod
+    def read_header(file_path: str) -> list:
+        '''
+        Read only the column names of a file, used to validate the schema before parsing
 
-                return combined_table
+        :param file_path: (str) csv or Excel file
+
+        :return: list of column names
+        '''
+        if CSVLoader.file_validator(file_path):
+            return pd.read_csv(file_path, nrows=0).columns.to_list()
+        return ExcelLoader.read_header(file_path, file_path)
+
+    def _read_file(self, file_path: str, columns: list = None, row_filter: str = None) -> pd.DataFrame:
+        '''
+        Parse a single file and tag its rows with the source file if requested
+
+        :param file_path: (str) csv or Excel file
+        :param columns: (list) columns to keep, None keeps every column
+        :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+        :return: Data Frame of the file
+        '''
+        loader = CSVLoader() if CSVLoader.file_validator(file_path) else ExcelLoader()
+        df = loader.load_data(file_path, columns, row_filter)
+        if self.source_column:
+            df[self.source_column] = file_path
+        return df
+
+    def _check_schema(self, files: list, executor: ThreadPoolExecutor) -> None:
+        '''
+        Validate that every file has the same header before any file is parsed
+
+        :param files: (list) file paths
+        :param executor: (ThreadPoolExecutor) pool used to read the headers
+
+        :return: None
+        '''
+        if not files:
+            raise FileNotFoundError("No csv or excel file found")
+        headers = list(executor.map(DirectoryLoader.read_header, files))
+        if any(header != headers[0] for header in headers):
+            raise ValueError("Files have different table format")
+
+    def load_data(self, path: str, columns: list = None, row_filter: str = None) -> pd.DataFrame:
+        '''
+        Main function to load all the files and combine them into one data frame, in file name order
+
+        :param path: (str) directory or glob pattern
+        :param columns: (list) columns to keep, None keeps every column
+        :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+        :return: Data Frame
+        '''
 
+        if not DirectoryLoader.file_validator(path):
+            raise ValueError("Path must be a directory or a glob pattern")
+
+        try:
+            files = self.list_files(path)
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                self._check_schema(files, executor)
+                frames = list(executor.map(lambda f: self._read_file(f, columns, row_filter), files))
+            return pd.concat(frames, ignore_index=True)
         except Exception as e:
-            raise IOError("Zip file load failed")
+            raise IOError(f"Directory load failed {e}")
+
+    def iter_batches(self, path: str, chunk_rows: int = 100_000, columns: list = None,
+                     row_filter: str = None) -> Iterator[pd.DataFrame]:
+        '''
+        Stream the files in file name order, at most `workers` files are read ahead of the consumer.
+        Files larger than chunk_rows are yielded in slices of chunk_rows rows
+
+        :param path: (str) directory or glob pattern
+        :param chunk_rows: (int) maximum number of rows in each batch
+        :param columns: (list) columns to keep, None keeps every column
+        :param row_filter: (str) DataFrame.query expression selecting the rows to keep
+
+        :return: iterator of data frames
+        '''
+
+        if not DirectoryLoader.file_validator(path):
+            raise ValueError("Path must be a directory or a glob pattern")
+
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows should be a positive integer")
+
+        try:
+            file_list = self.list_files(path)
+            files = iter(file_list)
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                self._check_schema(file_list, executor)
+                pending = deque(executor.submit(self._read_file, f, columns, row_filter)
+                                for f in itertools.islice(files, self.workers))
+                while pending:
+                    df = pending.popleft().result()
+                    for f in itertools.islice(files, 1):
+                        pending.append(executor.submit(self._read_file, f, columns, row_filter))
+                    for start in range(0, len(df), chunk_rows):
+                        yield df.iloc[start:start + chunk_rows]
+        except Exception as e:
+            raise IOError(f"Directory load failed {e}")
 
 
 class Data_Loader_Handler():
@@ -182,8 +871,14 @@ class Data_Loader_Handler():
     Class combined all the data load class and set strategy to load data
     '''
 
-    def __init__(self, strategy: DataLoadBasic = None):
+    def __init__(self, strategy: DataLoadBasic = None, cache: DataCache = None):
+        '''
+        :param strategy: (DataLoadBasic) loader to use, detected from the file extension if not provided
+        :param cache: (DataCache) optional on-disk cache serving repeat loads of unchanged files, loaders
+                      whose cache_settings() is None always parse the file
+        '''
         self._strategy = strategy
+        self._cache = cache
 
     def set_strategy(self, strategy: DataLoadBasic) -> None:
         '''
@@ -196,16 +891,60 @@ class Data_Loader_Handler():
 
         self._strategy = strategy
 
-    def load_data(self, file_path: str) -> pd.DataFrame:
+    def load_data(self, file_path: str, columns: list = None, row_filter: str = None) -> pd.DataFrame:
         '''
         Main function in handler that used to load data, will detect the best loader if not provided
 
         :param file_path (str): file path to the file want to load
+        :param columns (list): columns to keep, the other columns are skipped while parsing
+        :param row_filter (str): DataFrame.query expression, e.g. "SalePrice > 200000", applied while parsing
 
         :return: pd.DataFrame
         '''
+        self._detect_strategy(file_path)
+
+        if self._cache is None or not os.path.isfile(file_path) or self._strategy.cache_settings() is None:
+            return self._strategy.load_data(file_path, **pushdown_options(columns, row_filter))
+
+        key = self._cache.make_key(file_path, self._strategy, {'columns': columns, 'row_filter': row_filter})
+        df = self._cache.get(key)
+        if df is None:
+            df = self._strategy.load_data(file_path, **pushdown_options(columns, row_filter))
+            self._cache.put(key, df, source=file_path)
+        else:
+            self._strategy.cache_hit()
+        return df
+
+    def iter_batches(self, file_path: str, chunk_rows: int = 100_000, columns: list = None,
+                     row_filter: str = None) -> Iterator[pd.DataFrame]:
+        '''
+        Stream the file as bounded-size data frames, will detect the best loader if not provided
+
+        :param file_path (str): file path to the file want to load
+        :param chunk_rows (int): maximum number of rows in each batch
+        :param columns (list): columns to keep, the other columns are skipped while parsing
+        :param row_filter (str): DataFrame.query expression applied to every batch
+
+        :return: iterator of pd.DataFrame
+        '''
+        self._detect_strategy(file_path)
+
+        return self._strategy.iter_batches(file_path, chunk_rows, **pushdown_options(columns, row_filter))
+
+    def _detect_strategy(self, file_path: str) -> None:
+        '''
+        Pick the loader based on the file extension when no strategy has been set
+
+        :param file_path (str): file path to the file want to load
+
+        :return: None
+        '''
         if not self._strategy:
-            if CSVLoader.file_validator(file_path):
+            # glob patterns such as 'parts/*.csv' end with a file extension, so they are checked first
+            if DirectoryLoader.file_validator(file_path) and not os.path.isfile(file_path):
+                self._strategy = DirectoryLoader()
+
+            elif CSVLoader.file_validator(file_path):
                 self._strategy = CSVLoader()
 
             elif ExcelLoader.file_validator(file_path):
@@ -217,6 +956,4 @@ class Data_Loader_Handler():
             else:
                 raise ValueError("Current file is not supported in DataLoader")
 
-        return self._strategy.load_data(file_path)
-
 
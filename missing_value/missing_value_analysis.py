@@ -1,8 +1,6 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
-import seaborn as sns
 
 class MissValueAnalysis(ABC):
     '''
@@ -59,6 +57,9 @@ class SimpleMissingAnalyzer(MissValueAnalysis):
         '''
 
         print("Visualizing Missing Values......................")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.figure(figsize=(12,8))
         sns.heatmap(df.isnull(), cbar= False, cmap= 'viridis')
         plt.title('Missing Visualization Heatmap')
@@ -1,8 +1,6 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
-import seaborn as sns
 
 class MultiVariateBase(ABC):
     '''
@@ -47,6 +45,9 @@ class SimpleMultivariateStrategy(MultiVariateBase):
         '''
 
         print("Generating Heatmap for selected data frame with specific features ........")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.figure(figsize=(16,8))
         sns.heatmap(df.corr(), annot=True, fmt= '.2f', cmap='coolwarm')
         plt.title('Correlation HeatMap')
@@ -60,6 +61,9 @@ class SimpleMultivariateStrategy(MultiVariateBase):
         '''
 
         print("Generating Pariplot for selected data frame with specific features ........")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.figure(figsize=(12,8))
         sns.pairplot(df)
         # plt.title("Pairplot for Target DataFrame for Selected Features")
@@ -53,3 +53,157 @@ def test_datainspector(sample_df):
 
 
 
+
+def test_profile_strategy(sample_df):
+    '''
+    Testing function for the ProfileStrategy(), the one pass profile should match pandas
+
+    :param sample_df (pd.DataFrame) : sample dataframe used to test the ProfileStrategy()
+
+    :return:
+    '''
+    from analyze_data.analyze_package import ProfileStrategy, DataProfile
+
+    profile = DataInspector(ProfileStrategy()).analyze(sample_df)
+    assert isinstance(profile, DataProfile)
+    assert profile.rows == len(sample_df)
+
+    datatype_analyzer = DataTypeStrategy()
+    assert profile.numeric_columns() == datatype_analyzer.get_numeric_columns(sample_df)
+    assert profile.categorical_columns() == datatype_analyzer.get_categorical_columns(sample_df)
+
+    pd.testing.assert_frame_equal(profile.describe(), sample_df.describe(), check_exact=False, rtol=1e-9)
+    expected = sample_df.describe(include=['O'])
+    result = profile.describe('categorical')
+    assert result.loc['top'].to_list() == expected.loc['top'].to_list()
+    assert result.loc[['count', 'unique', 'freq']].astype(int).equals(expected.loc[['count', 'unique', 'freq']].astype(int))
+    assert profile.columns['missing'].to_list() == sample_df.isna().sum().to_list()
+    assert profile.columns['distinct'].to_list() == sample_df.nunique().to_list()
+
+def test_streaming_summary_strategy(sample_df):
+    '''
+    Testing function for the StreamingSummaryStrategy(), batches and merged workers should match describe()
+
+    :param sample_df (pd.DataFrame) : sample dataframe used to test the StreamingSummaryStrategy()
+
+    :return:
+    '''
+    from analyze_data.analyze_package import StreamingSummaryStrategy
+
+    batches = [sample_df.iloc[start:start + 200] for start in range(0, len(sample_df), 200)]
+    result = DataInspector(StreamingSummaryStrategy()).analyze(iter(batches))
+    expected = sample_df.describe()
+
+    numeric = result['numeric']
+    assert numeric.index.equals(expected.index) and numeric.columns.equals(expected.columns)
+    exact_rows = ['count', 'mean', 'std', 'min', 'max']
+    pd.testing.assert_frame_equal(numeric.loc[exact_rows], expected.loc[exact_rows], rtol=1e-9)
+    spread = expected.loc['max'] - expected.loc['min']
+    assert ((numeric.loc[['25%', '50%', '75%']] - expected.loc[['25%', '50%', '75%']]).abs() <= 0.05 * spread).all().all()
+
+    categorical = result['categorical']
+    expected = sample_df.describe(include=['O'])
+    assert categorical.loc['top'].to_list() == expected.loc['top'].to_list()
+    assert categorical.loc['count'].to_list() == expected.loc['count'].to_list()
+    assert categorical.loc['unique'].to_list() == expected.loc['unique'].to_list()
+
+    first, second = StreamingSummaryStrategy(), StreamingSummaryStrategy()
+    for position, batch in enumerate(batches):
+        (first if position % 2 else second).partial_fit(batch)
+    merged = first.merge(second).summary()
+    pd.testing.assert_frame_equal(merged.loc[exact_rows], numeric.loc[exact_rows], rtol=1e-9)
+    assert (first.distinct_counts() - sample_df.nunique()[first.distinct_counts().index]).abs().max() <= 0.02 * len(sample_df)
+
+def test_datainspector_cache(sample_df):
+    '''
+    Testing function for the DataInspector() result cache
+
+    :param sample_df (pd.DataFrame) : sample dataframe used to test the cache
+
+    :return:
+    '''
+    from analyze_data.analyze_package import ProfileStrategy, frame_fingerprint
+
+    data_inspector = DataInspector(ProfileStrategy(), cache_size=2)
+    profile = data_inspector.analyze(sample_df)
+    assert data_inspector.analyze(sample_df.copy()) is profile
+    assert (data_inspector.hits, data_inspector.misses) == (1, 1)
+
+    changed = sample_df.copy()
+    changed.loc[0, 'SalePrice'] = 1
+    assert frame_fingerprint(changed) != frame_fingerprint(sample_df)
+    assert data_inspector.analyze(changed) is not profile
+
+    assert data_inspector.profile(sample_df) is data_inspector.profile(sample_df)
+    assert data_inspector.hits == 2
+    assert len(data_inspector._cache) == 2
+    data_inspector.set_strategy(ProfileStrategy())
+    assert data_inspector.analyze(sample_df) is not profile
+
+    data_inspector.set_strategy(SummaryStatisticStrategy())
+    assert data_inspector.analyze(sample_df) is None
+    assert data_inspector.analyze(sample_df) is None
+    assert data_inspector.get_columns(sample_df) == data_inspector.get_columns(sample_df)
+    assert (data_inspector.hits, data_inspector.misses) == (2, 4)
+    assert len(data_inspector._cache) == 2
+
+    edited = sample_df.copy()
+    edited.loc[3, 'SalePrice'] += 1
+    assert frame_fingerprint(edited) != frame_fingerprint(sample_df)
+    profile_inspector = DataInspector()
+    assert profile_inspector.profile(sample_df).columns.loc['SalePrice', 'mean'] != \
+        profile_inspector.profile(edited).columns.loc['SalePrice', 'mean']
+
+    # row 100 lies between the sampled blocks, only the full fingerprint sees the edit
+    edited = sample_df.copy()
+    edited.loc[100, 'SalePrice'] += 1
+    assert frame_fingerprint(edited) == frame_fingerprint(sample_df)
+    assert frame_fingerprint(edited, full=True) != frame_fingerprint(sample_df, full=True)
+    full_inspector = DataInspector(full_fingerprint=True)
+    assert full_inspector.profile(sample_df).columns.loc['SalePrice', 'mean'] != \
+        full_inspector.profile(edited).columns.loc['SalePrice', 'mean']
+
+def test_memory_footprint_strategy(sample_df):
+    '''
+    Testing function for the MemoryFootprintStrategy()
+
+    :param sample_df (pd.DataFrame) : sample dataframe used to test the MemoryFootprintStrategy()
+
+    :return:
+    '''
+    from analyze_data.analyze_package import MemoryFootprintStrategy
+
+    report = DataInspector(MemoryFootprintStrategy()).analyze(sample_df)
+    assert set(report.index) == set(sample_df.columns)
+    assert report['bytes'].sum() == sample_df.memory_usage(deep=True, index=False).sum()
+
+    assert report.loc['MSZoning', 'recommended'] == 'category'
+    assert report.loc['MSZoning', 'category_bytes'] == sample_df['MSZoning'].astype('category').memory_usage(deep=True, index=False)
+    assert report.loc['YearBuilt', 'recommended'] == 'uint16'
+    assert report.loc['YearBuilt', 'numeric_bytes'] == 2 * len(sample_df)
+    assert report.loc['PoolArea', 'sparse_bytes'] == (sample_df['PoolArea'] != 0).sum() * 12
+    assert report['best_savings'].is_monotonic_decreasing
+
+def test_streaming_summary_chunked_file(sample_df):
+    '''
+    Testing function for the StreamingSummaryStrategy() on a chunked csv, text columns whose first chunks
+    hold only nulls (e.g. PoolQC) are read as float there and must still be summarized as text
+
+    :param sample_df (pd.DataFrame) : sample dataframe used to check the summary
+
+    :return:
+    '''
+    from analyze_data.analyze_package import StreamingSummaryStrategy
+    from load_data.load_data_package import Data_Loader_Handler
+
+    batches = Data_Loader_Handler().iter_batches('sample_data/train.csv', chunk_rows=100)
+    result = DataInspector(StreamingSummaryStrategy()).analyze(batches)
+
+    expected = sample_df.describe(include=['O'])
+    categorical = result['categorical']
+    assert sorted(categorical.columns) == sorted(expected.columns)
+    assert categorical.loc['count', 'PoolQC'] == expected.loc['count', 'PoolQC']
+    assert categorical.loc['top', 'PoolQC'] == expected.loc['top', 'PoolQC']
+    assert sorted(result['numeric'].columns) == sorted(sample_df.describe().columns)
+    pd.testing.assert_series_equal(result['numeric'].loc['mean', sample_df.describe().columns],
+                                   sample_df.describe().loc['mean'], rtol=1e-9)
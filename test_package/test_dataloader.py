@@ -4,8 +4,10 @@ import zipfile
 from tempfile import tempdir
 import pytest
 
-from load_data.load_data_package import CSVLoader, ExcelLoader, ZipLoader, Data_Loader_Handler
+from load_data.load_data_package import DataLoadBasic, CSVLoader, ExcelLoader, ZipLoader, DirectoryLoader, Data_Loader_Handler
+from load_data.data_cache import DataCache
 
+import numpy as np
 import pandas as pd
 import os
 
@@ -135,3 +137,342 @@ def test_no_nameLoader(create_test_csv):
     assert list(df.columns) == ['Name', 'Age', 'City']
 
 
+
+def test_CSVLoader_batches(create_test_csv, sample_df):
+    '''
+    Test function to test if CSVLoader streams the file in bounded batches
+
+    :param create_test_csv: (pytest_fixture) test csv file generated from the fixture
+
+    :return: True | False
+    '''
+    csv_loader = Data_Loader_Handler()
+    batches = list(csv_loader.iter_batches(create_test_csv, chunk_rows=2))
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert pd.concat(batches, ignore_index=True).equals(sample_df)
+
+def test_ZIPLoader_pattern(create_test_zip):
+    '''
+    Test function to test if ZipLoader only loads the members matching the glob pattern
+
+    :param create_test_zip: (pytest_fixture) test zip file generated from the fixture
+
+    :return: True | False
+    '''
+    zip_loader = Data_Loader_Handler(ZipLoader(file_type='csv', pattern='*.csv'))
+    df = zip_loader.load_data(create_test_zip)
+
+    assert len(df) == 3
+    assert list(df.columns) == ['Name', 'Age', 'City']
+
+    with pytest.raises(IOError):
+        Data_Loader_Handler(ZipLoader(file_type='csv', pattern='*.txt')).load_data(create_test_zip)
+
+def test_ZIPLoader_many_members(sample_df, tmp_path):
+    '''
+    Test function to test if ZipLoader combines many members in order and reports each member
+
+    :param sample_df: (pytest_fixture) sample data frame
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    zip_file_path = str(tmp_path / 'daily.zip')
+    with zipfile.ZipFile(zip_file_path, 'w') as zipf:
+        for day in range(20):
+            zipf.writestr(f'daily/{day:02d}.csv', sample_df.assign(Day=day).to_csv(index=False))
+
+    zip_loader = ZipLoader()
+    df = zip_loader.load_data(zip_file_path)
+
+    assert len(df) == 60
+    assert df['Day'].to_list() == [day for day in range(20) for _ in range(3)]
+    assert zip_loader.member_report['member'].to_list() == [f'daily/{day:02d}.csv' for day in range(20)]
+    assert (zip_loader.member_report['rows'] == 3).all()
+
+def test_ZIPLoader_schema_mismatch(sample_df, tmp_path):
+    '''
+    Test function to test if ZipLoader rejects members with different table format
+
+    :param sample_df: (pytest_fixture) sample data frame
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    zip_file_path = str(tmp_path / 'mixed.zip')
+    with zipfile.ZipFile(zip_file_path, 'w') as zipf:
+        zipf.writestr('a.csv', sample_df.to_csv(index=False))
+        zipf.writestr('b.csv', sample_df.drop(columns='City').to_csv(index=False))
+
+    with pytest.raises(IOError):
+        ZipLoader().load_data(zip_file_path)
+
+def test_parallel_loaders(sample_df, tmp_path):
+    '''
+    Test function to test if the process pool in ExcelLoader and ZipLoader keeps the original row order
+
+    :param sample_df: (pytest_fixture) sample data frame
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    excel_file_path = str(tmp_path / 'sheets.xlsx')
+    with pd.ExcelWriter(excel_file_path) as writer:
+        for sheet in range(4):
+            sample_df.assign(Sheet=sheet).to_excel(writer, sheet_name=f'Sheet{sheet}', index=False)
+
+    serial_df = ExcelLoader().load_data(excel_file_path)
+    parallel_df = ExcelLoader(workers=2).load_data(excel_file_path)
+    assert parallel_df.equals(serial_df)
+    assert parallel_df['Sheet'].to_list() == [sheet for sheet in range(4) for _ in range(3)]
+
+    zip_file_path = str(tmp_path / 'archive.zip')
+    with zipfile.ZipFile(zip_file_path, 'w') as zipf:
+        zipf.write(excel_file_path, arcname='sheets.xlsx')
+        for day in range(4):
+            zipf.writestr(f'{day}.csv', sample_df.assign(Sheet=day).to_csv(index=False))
+
+    assert ZipLoader(workers=2).load_data(zip_file_path).equals(ZipLoader().load_data(zip_file_path))
+
+def test_cached_loader(create_test_csv, tmp_path):
+    '''
+    Test function to test if repeat loads are served from the DataCache until the source changes
+
+    :param create_test_csv: (pytest_fixture) test csv file generated from the fixture
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    class CountingLoader(CSVLoader):
+        calls = 0
+
+        def load_data(self, path, columns=None, row_filter=None):
+            CountingLoader.calls += 1
+            return super().load_data(path, columns, row_filter)
+
+    cache = DataCache(str(tmp_path / 'cache'))
+    loader = Data_Loader_Handler(CountingLoader(), cache=cache)
+    first = loader.load_data(create_test_csv)
+    second = loader.load_data(create_test_csv)
+
+    assert CountingLoader.calls == 1
+    assert second.equals(first)
+
+    pd.concat([first, first]).to_csv(create_test_csv, index=False)
+    assert len(loader.load_data(create_test_csv)) == 6
+    assert CountingLoader.calls == 2
+
+    assert cache.invalidate(create_test_csv) == 2
+    loader.load_data(create_test_csv)
+    assert CountingLoader.calls == 3
+
+def test_cached_loader_state(create_test_csv, create_test_zip, tmp_path):
+    '''
+    Test function to test if state filled by a load does not change the cache key
+
+    :param create_test_csv: (pytest_fixture) test csv file generated from the fixture
+    :param create_test_zip: (pytest_fixture) test zip file generated from the fixture
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    cache = DataCache(str(tmp_path / 'cache'))
+    csv_loader = CSVLoader(infer_schema=True)
+    key = cache.make_key(create_test_csv, csv_loader)
+    handler = Data_Loader_Handler(csv_loader, cache=cache)
+    first = handler.load_data(create_test_csv)
+    assert csv_loader.schema is not None
+    assert cache.make_key(create_test_csv, csv_loader) == key
+    assert handler.load_data(create_test_csv).equals(first)
+    handler.load_data(create_test_csv)
+    assert len(cache._read_index()) == 1
+
+    zip_loader = ZipLoader()
+    handler = Data_Loader_Handler(zip_loader, cache=cache)
+    key = cache.make_key(create_test_zip, zip_loader)
+    handler.load_data(create_test_zip)
+    assert zip_loader.member_report is not None
+    assert cache.make_key(create_test_zip, zip_loader) == key
+    handler.load_data(create_test_zip)
+    assert zip_loader.member_report is None
+    assert len(cache._read_index()) == 2
+    assert cache.make_key(create_test_zip, ZipLoader(workers=2)) == key
+    assert cache.make_key(create_test_zip, ZipLoader(file_type='csv')) != key
+
+def test_cache_eviction(sample_df, tmp_path):
+    '''
+    Test function to test if DataCache evicts the least recently used frames above max_bytes
+
+    :param sample_df: (pytest_fixture) sample data frame
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    cache = DataCache(str(tmp_path / 'cache'), file_format='feather')
+    cache.put('a', sample_df)
+    entry_size = cache.size()
+    cache.max_bytes = 2 * entry_size
+    cache.put('b', sample_df)
+    cache.get('a')
+    cache.put('c', sample_df)
+
+    assert cache.get('b') is None
+    assert cache.get('a').equals(sample_df)
+    assert cache.get('c').equals(sample_df)
+
+def test_compact_schema(tmp_path):
+    '''
+    Test function to test if the inferred schema shrinks train.csv and can be saved and reused
+
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    default_df = CSVLoader().load_data('sample_data/train.csv')
+    loader = CSVLoader(infer_schema=True)
+    compact_df = loader.load_data('sample_data/train.csv')
+
+    assert default_df.memory_usage(deep=True).sum() > 3 * compact_df.memory_usage(deep=True).sum()
+    assert compact_df['Neighborhood'].dtype == 'category'
+    assert compact_df['LotFrontage'].dtype == 'float32'
+    assert compact_df['SalePrice'].equals(default_df['SalePrice'].astype(compact_df['SalePrice'].dtype))
+
+    schema_path = str(tmp_path / 'schema.json')
+    CSVLoader.save_schema(loader.schema, schema_path)
+    reused_df = CSVLoader(schema=CSVLoader.load_schema(schema_path)).load_data('sample_data/train.csv')
+    assert reused_df.dtypes.equals(compact_df.dtypes)
+
+def test_schema_widens_beyond_sample(tmp_path):
+    '''
+    Test function to test if values outside the sampled range keep their exact value
+
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    csv_file_path = str(tmp_path / 'wide.csv')
+    pd.DataFrame({'value': [1, 2, 3, 70000, -5], 'ratio': [1.0, 2.0, 3.0, 3.5, None]}).to_csv(csv_file_path, index=False)
+
+    df = CSVLoader(infer_schema=True, sample_rows=3).load_data(csv_file_path)
+    assert df['value'].to_list() == [1, 2, 3, 70000, -5]
+    assert df['ratio'].to_list()[:4] == [1.0, 2.0, 3.0, 3.5]
+
+def test_schema_categories_across_batches(tmp_path):
+    '''
+    Test function to test if the batches of a schema load share their categories and concatenate as category
+
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    loader = CSVLoader(infer_schema=True)
+    batches = list(loader.iter_batches('sample_data/train.csv', chunk_rows=100))
+    df = pd.concat(batches, ignore_index=True)
+    assert df['Neighborhood'].dtype == 'category'
+    assert df['Neighborhood'].dtype == loader.schema['Neighborhood']
+    assert df['Neighborhood'].astype(object).equals(CSVLoader().load_data('sample_data/train.csv')['Neighborhood'])
+
+    schema_path = str(tmp_path / 'schema.json')
+    CSVLoader.save_schema(loader.schema, schema_path)
+    assert CSVLoader.load_schema(schema_path)['Neighborhood'] == loader.schema['Neighborhood']
+
+    csv_file_path = str(tmp_path / 'unseen.csv')
+    pd.DataFrame({'city': ['a', 'b', 'a', 'b', 'c', 'c']}).to_csv(csv_file_path, index=False)
+    batches = list(CSVLoader(infer_schema=True, sample_rows=4).iter_batches(csv_file_path, chunk_rows=2))
+    assert pd.concat(batches, ignore_index=True)['city'].to_list() == ['a', 'b', 'a', 'b', 'c', 'c']
+
+def test_column_and_row_pushdown(create_test_zip, tmp_path):
+    '''
+    Test function to test if columns and row_filter are applied by every loader
+
+    :param create_test_zip: (pytest_fixture) test zip file generated from the fixture
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    for path in ['test_file.csv', 'test_file.xlsx', create_test_zip]:
+        df = Data_Loader_Handler().load_data(path, columns=['City', 'Name'], row_filter='Age > 26')
+        assert list(df.columns) == ['City', 'Name']
+        assert df['Name'].to_list()[:2] == ['Bob', 'Charlie']
+
+    full_df = pd.read_csv('sample_data/train.csv')
+    expected = full_df.loc[full_df['SalePrice'] > 300000, ['Id', 'Neighborhood']].reset_index(drop=True)
+    loader = Data_Loader_Handler(CSVLoader())
+    assert loader.load_data('sample_data/train.csv', ['Id', 'Neighborhood'], 'SalePrice > 300000').equals(expected)
+
+    batches = loader.iter_batches('sample_data/train.csv', chunk_rows=100, columns=['Id', 'Neighborhood'],
+                                  row_filter='SalePrice > 300000')
+    assert pd.concat(batches, ignore_index=True).equals(expected)
+
+def test_loader_without_pushdown(create_test_csv):
+    '''
+    Test function to test if a loader implementing the old load_data(self, path) still works through the handler
+
+    :param create_test_csv: (pytest_fixture) test csv file generated from the fixture
+
+    :return: True | False
+    '''
+    class PathOnlyLoader(DataLoadBasic):
+        def load_data(self, path):
+            return pd.read_csv(path)
+
+    handler = Data_Loader_Handler(PathOnlyLoader())
+    df = handler.load_data(create_test_csv)
+    assert df.equals(pd.read_csv(create_test_csv))
+    assert pd.concat(handler.iter_batches(create_test_csv)).equals(df)
+
+def test_DirectoryLoader(sample_df, tmp_path):
+    '''
+    Test function to test if DirectoryLoader combines and streams partitioned files in name order
+
+    :param sample_df: (pytest_fixture) sample data frame
+    :param tmp_path: (pytest_fixture) temporary directory
+
+    :return: True | False
+    '''
+    for part in range(12):
+        sample_df.assign(Part=part).to_csv(tmp_path / f'part-{part:02d}.csv', index=False)
+    (tmp_path / 'notes.txt').write_text('not a table')
+
+    df = Data_Loader_Handler().load_data(str(tmp_path / '*.csv'))
+    assert df['Part'].to_list() == [part for part in range(12) for _ in range(3)]
+
+    loader = DirectoryLoader(workers=3, source_column='source')
+    tagged_df = loader.load_data(str(tmp_path), columns=['Name', 'Part'], row_filter='Age > 26')
+    assert list(tagged_df.columns) == ['Name', 'Part', 'source']
+    assert len(tagged_df) == 24
+    assert tagged_df['source'].iloc[0].endswith('part-00.csv')
+
+    batches = list(loader.iter_batches(str(tmp_path), chunk_rows=2))
+    assert max(len(batch) for batch in batches) == 2
+    assert pd.concat(batches)['Part'].to_list() == df['Part'].to_list()
+
+    sample_df.drop(columns='City').to_csv(tmp_path / 'part-99.csv', index=False)
+    with pytest.raises(IOError):
+        loader.load_data(str(tmp_path))
+
+    excel_dir = tmp_path / 'excel'
+    excel_dir.mkdir()
+    sample_df.to_csv(excel_dir / 'part-00.csv', index=False)
+    with pd.ExcelWriter(excel_dir / 'part-01.xlsx') as writer:
+        sample_df.to_excel(writer, sheet_name='first', index=False)
+        sample_df.drop(columns='City').to_excel(writer, sheet_name='second', index=False)
+    with pytest.raises(IOError, match='different table format'):
+        DirectoryLoader().load_data(str(excel_dir))
+
+def test_compact_schema_then_fill():
+    '''
+    Test function to test if a frame loaded with the inferred schema can be filled with the default imputation
+
+    :return: True | False
+    '''
+    from data_handler.missing_value_fix import Fill_Strategy
+
+    compact_df = CSVLoader(infer_schema=True).load_data('sample_data/train.csv')
+    default_df = CSVLoader().load_data('sample_data/train.csv')
+    assert compact_df['MasVnrArea'].dtype == 'float32'
+
+    filled = Fill_Strategy('mean').handle(compact_df, ['LotFrontage', 'MasVnrArea'])
+    assert not filled[['LotFrontage', 'MasVnrArea']].isna().any().any()
+    assert np.isclose(filled['LotFrontage'].mean(), default_df['LotFrontage'].mean(), rtol=1e-5)
@@ -42,3 +42,116 @@ def test_logtransformation(sample_df_small: pd.DataFrame, sample_columns: dict,
     transformer = LogTransformation(['SalePrice'])
     new_df = transformer.transform(sample_df)
     analyzer.analyze(new_df, 'SalePrice')
+
+def test_inplace_chain_memory():
+    '''
+    Testing function to check that an inplace fill and log transformation chain allocates
+    no more than the modified columns
+    :return:
+    '''
+    import tracemalloc
+    from data_handler.missing_value_fix import Fill_Strategy
+
+    df = pd.DataFrame(np.random.default_rng(0).random((200_000, 8)), columns=list('ABCDEFGH'))
+    df.iloc[::3, 0] = np.nan
+    frame_bytes = df.memory_usage().sum()
+    original_b = df['B'].copy()
+
+    tracemalloc.start()
+    result = Fill_Strategy('mean', inplace=True).handle(df, ['A'])
+    result = LogTransformation(['B'], inplace=True).transform(result)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert result is df
+    assert not df['A'].hasnans
+    assert np.allclose(df['B'], np.log1p(original_b))
+    assert peak < 0.5 * frame_bytes
+
+    copy_result = LogTransformation(['C']).transform(df)
+    assert copy_result is not df
+    assert copy_result['D'].equals(df['D'])
+    assert not copy_result['C'].equals(df['C'])
+
+def test_power_transformations(sample_df: pd.DataFrame, tmp_path):
+    '''
+    Testing function for PowerTransformation and QuantileNormalTransformation, a streaming fit
+    over chunks and a reloaded fit should transform new batches like the full fit
+    :return:
+    '''
+    from data_handler.data_transformation import PowerTransformation, QuantileNormalTransformation
+
+    features = ['SalePrice', 'GrLivArea']
+    box_cox = PowerTransformation(features, method='box-cox', standardize=True).fit(sample_df)
+    transformed = box_cox.transform(sample_df)
+    assert abs(transformed['SalePrice'].skew()) < 0.2 < abs(sample_df['SalePrice'].skew())
+    assert abs(transformed['SalePrice'].mean()) < 1e-6
+    with pytest.raises(IOError):
+        box_cox.transform(pd.DataFrame({'SalePrice': [-1.0], 'GrLivArea': [1.0]}))
+
+    centered = sample_df[['LotFrontage']] - 60
+    yeo_johnson = PowerTransformation(['LotFrontage']).fit(centered)
+    streaming = PowerTransformation(['LotFrontage'])
+    for chunk in (centered.iloc[:500], centered.iloc[500:1000], centered.iloc[1000:]):
+        streaming.partial_fit(chunk)
+    assert streaming.parameters_['LotFrontage']['lambda'] == yeo_johnson.parameters_['LotFrontage']['lambda']
+    assert yeo_johnson.transform(centered)['LotFrontage'].isna().sum() == centered['LotFrontage'].isna().sum()
+
+    path = str(tmp_path / 'parameters.json')
+    box_cox.save_parameters(path)
+    reloaded = PowerTransformation.load_parameters(path)
+    pd.testing.assert_frame_equal(reloaded.transform(sample_df.iloc[:10]), transformed.iloc[:10])
+
+    quantile = QuantileNormalTransformation(features, n_quantiles=200).fit(sample_df)
+    normal = quantile.transform(sample_df)
+    assert abs(normal['SalePrice'].mean()) < 0.01 and abs(normal['SalePrice'].std() - 1) < 0.05
+    assert normal['SalePrice'].rank().equals(sample_df['SalePrice'].rank())
+
+def test_parallel_column_blocks():
+    '''
+    Testing function to check that the column block thread pool gives the same frame, in the same column order
+    :return:
+    '''
+    from data_handler.missing_value_fix import Fill_Strategy
+
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=(1_000, 37))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    df = pd.DataFrame(values, columns=[f'col_{i}' for i in range(37)])
+    features = list(reversed(df.columns))
+
+    expected = LogTransformation(features).transform(df)
+    for workers in (2, 5, 64):
+        result = LogTransformation(features, workers=workers).transform(df)
+        pd.testing.assert_frame_equal(result, expected)
+
+    expected = Fill_Strategy('median').handle(df)
+    result = Fill_Strategy('median', workers=4).handle(df)
+    pd.testing.assert_frame_equal(result, expected)
+    assert result.columns.equals(df.columns)
+
+def test_downcast_transformation(sample_df: pd.DataFrame):
+    '''
+    Testing function for DowncastTransformation, the values are kept and later batches are widened when needed
+    :return:
+    '''
+    from data_handler.data_transformation import DowncastTransformation
+
+    downcast = DowncastTransformation().fit(sample_df)
+    small = downcast.transform(sample_df)
+    assert small.memory_usage(deep=True).sum() < sample_df.memory_usage(deep=True).sum() / 3
+    assert small['YearBuilt'].dtype == 'uint16'
+    assert small['MSZoning'].dtype == 'category'
+    pd.testing.assert_frame_equal(small.astype(object).where(small.notna(), None),
+                                  sample_df.astype(object).where(sample_df.notna(), None), check_dtype=False)
+
+    from data_handler.missing_value_fix import Fill_Strategy
+    filled = Fill_Strategy('mean').handle(small, ['LotFrontage', 'MasVnrArea'])
+    assert not filled[['LotFrontage', 'MasVnrArea']].isna().any().any()
+    assert np.isclose(filled['LotFrontage'].mean(), sample_df['LotFrontage'].mean(), rtol=1e-5)
+
+    batch = sample_df.iloc[:5].copy()
+    batch.loc[batch.index[0], 'YearBuilt'] = 100_000
+    result = downcast.transform(batch)
+    assert result['YearBuilt'].iloc[0] == 100_000
+    assert result['OverallQual'].dtype == downcast.schema_['OverallQual']
@@ -4,7 +4,7 @@ import pandas as pd
 import numpy as np
 import pytest
 import seaborn as sns
-from data_handler.missing_value_fix import Drop_Strategy, Fill_Strategy, Missing_Value_Handler
+from data_handler.missing_value_fix import Drop_Strategy, Fill_Strategy, GroupFill_Strategy, KNN_Strategy, Missing_Value_Handler
 from analyze_data.analyze_package import DataInspector
 
 @pytest.fixture
@@ -76,4 +76,175 @@ def testing_missinghandler(sample_df_small):
     handler.set_method('median')
     handler.set_value(3)
     new_df = handler.process(sample_df_small)
-    print(new_df)
\ No newline at end of file
+    print(new_df)
+
+def test_missinghandler_default_strategy():
+    '''
+    Testing function to test that default constructed Missing_Value_Handler do not share their fill values
+    :return: None
+    '''
+    first = Missing_Value_Handler().fit(pd.DataFrame({'a': [1.0, 3.0, np.nan]}))
+    second = Missing_Value_Handler().fit(pd.DataFrame({'a': [10.0, 30.0, np.nan]}))
+    assert first._strategy is not second._strategy
+    assert first.transform(pd.DataFrame({'a': [np.nan]}))['a'].iloc[0] == 2.0
+    assert second.transform(pd.DataFrame({'a': [np.nan]}))['a'].iloc[0] == 20.0
+
+def test_process_batches(sample_df_small):
+    '''
+    Testing function to test Missing_Value_Handler on a stream of batches
+    :param sample_df_small (pd.DataFrame): Testing DataFrame
+    :return: None
+    '''
+    handler = Missing_Value_Handler(Fill_Strategy('constant', 0))
+    batches = [sample_df_small.iloc[:2], sample_df_small.iloc[2:]]
+    new_df = pd.concat(handler.process_batches(batches))
+    assert new_df.equals(sample_df_small.fillna(0))
+
+def test_fitted_fill(sample_df_small, tmp_path):
+    '''
+    Testing function to test Fill_Strategy fit/transform with persisted statistics
+    :param sample_df_small (pd.DataFrame): Testing DataFrame
+    :param tmp_path: temporary directory
+    :return: None
+    '''
+    handler = Missing_Value_Handler(Fill_Strategy('median'))
+    handler.fit(sample_df_small)
+    batch = pd.DataFrame({'A': [np.nan, 0.0], 'B': [np.nan, np.nan], 'C': [1.0, np.nan]})
+    new_df = handler.transform(batch)
+    assert new_df['A'].to_list() == [2.5, 0.0]
+    assert new_df['B'].to_list() == [6.0, 6.0]
+    assert new_df['C'].to_list() == [1.0, 10.0]
+
+    path = str(tmp_path / 'fill.json')
+    handler._strategy.save_statistics(path)
+    loaded = Fill_Strategy.load_statistics(path)
+    assert loaded.method == 'median'
+    assert loaded.transform(batch).equals(new_df)
+
+    mode_df = Fill_Strategy('mode').handle(pd.DataFrame({'D': ['x', 'y', 'y', None]}))
+    assert mode_df['D'].to_list() == ['x', 'y', 'y', 'y']
+
+def test_inplace_strategies(sample_df_small):
+    '''
+    Testing function to test the inplace mode of Drop_Strategy and Fill_Strategy
+    :param sample_df_small (pd.DataFrame): Testing DataFrame
+    :return: None
+    '''
+    original = sample_df_small.copy()
+    filled = Fill_Strategy('constant', 0).handle(sample_df_small, ['A'])
+    assert sample_df_small.equals(original)
+    assert filled['B'].equals(sample_df_small['B'])
+
+    dropped = Drop_Strategy(inplace=True).handle(sample_df_small)
+    assert dropped is sample_df_small
+    assert len(sample_df_small) == 2
+
+def test_streaming_fill(sample_df):
+    '''
+    Testing function to test the two pass streaming imputation against the in-memory statistics
+    :param sample_df (pd.DataFrame): Testing DataFrame
+    :return: None
+    '''
+    batches = [sample_df.iloc[start:start + 100] for start in range(0, len(sample_df), 100)]
+
+    mean_handler = Missing_Value_Handler(Fill_Strategy('mean')).fit_batches(batches)
+    expected_mean = sample_df.select_dtypes('number').mean()
+    for col, value in mean_handler._strategy.statistics_.items():
+        assert np.isclose(value, expected_mean[col])
+
+    median_handler = Missing_Value_Handler(Fill_Strategy('median', sketch_size=50)).fit_batches(batches, ['SalePrice'])
+    rank = (sample_df['SalePrice'] <= median_handler._strategy.statistics_['SalePrice']).mean()
+    assert abs(rank - 0.5) < 0.05
+
+    mode_handler = Missing_Value_Handler(Fill_Strategy('mode', sketch_size=20)).fit_batches(batches, ['MSZoning', 'GarageType'])
+    assert mode_handler._strategy.statistics_ == {'MSZoning': 'RL', 'GarageType': 'Attchd'}
+
+    filled = pd.concat(mode_handler.transform_batches(batches))
+    assert not filled[['MSZoning', 'GarageType']].isna().any().any()
+
+def test_group_fill(sample_df):
+    '''
+    Testing function to test GroupFill_Strategy against a groupby transform
+    :param sample_df (pd.DataFrame): Testing DataFrame
+    :return: None
+    '''
+    handler = GroupFill_Strategy('Neighborhood')
+    new_df = handler.handle(sample_df, ['LotFrontage', 'MasVnrArea'])
+    expected = sample_df['LotFrontage'].fillna(sample_df.groupby('Neighborhood')['LotFrontage'].transform('median'))
+    expected = expected.fillna(sample_df['LotFrontage'].median())
+    assert new_df['LotFrontage'].equals(expected)
+    assert not new_df[['LotFrontage', 'MasVnrArea']].isna().any().any()
+    assert sample_df['LotFrontage'].hasnans
+
+    mode_handler = GroupFill_Strategy(['Neighborhood', 'MSZoning'], method='mode').fit(sample_df, ['GarageType'])
+    filled = mode_handler.transform(sample_df)
+    group_modes = sample_df.groupby(['Neighborhood', 'MSZoning'])['GarageType'].agg(lambda s: s.mode().iloc[0] if s.notna().any() else None)
+    row = sample_df[sample_df['GarageType'].isna() & (sample_df['Neighborhood'] == 'Edwards')].index[0]
+    assert filled.loc[row, 'GarageType'] == group_modes[('Edwards', sample_df.loc[row, 'MSZoning'])]
+
+def test_knn_fill():
+    '''
+    Testing function to test KNN_Strategy, blocked and threaded runs should agree with the nearest rows
+    :return: None
+    '''
+    df = pd.DataFrame({'A': [1.0, 1.1, 5.0, 5.2, 1.05, 5.1],
+                       'B': [10.0, 10.5, 50.0, 52.0, 10.2, 51.0],
+                       'C': [100.0, 110.0, 500.0, 520.0, np.nan, np.nan]})
+    new_df = KNN_Strategy(n_neighbors=2).handle(df)
+    assert new_df['C'].to_list() == [100.0, 110.0, 500.0, 520.0, 105.0, 510.0]
+    assert df['C'].hasnans
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(2_000, 6))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    wide_df = pd.DataFrame(values, columns=list('ABCDEF'))
+    single_block = KNN_Strategy().handle(wide_df)
+    small_blocks = KNN_Strategy(max_memory_mb=0.05, workers=4).handle(wide_df)
+    assert not single_block.isna().any().any()
+    assert single_block.equals(small_blocks)
+    assert not KNN_Strategy(max_donors=500).handle(wide_df).isna().any().any()
+
+def test_knn_block_memory():
+    '''
+    Testing function to test that one KNN_Strategy block, temporaries included, stays within max_memory_mb
+    :return: None
+    '''
+    import tracemalloc
+
+    rng = np.random.default_rng(0)
+    strategy = KNN_Strategy(max_memory_mb=4)
+    donors, features = 20_000, 5
+    block_rows = strategy._block_rows(donors, features)
+    values = rng.random((donors, features)).astype(np.float32)
+    present = np.ones((donors, features), dtype=np.float32)
+    targets = rng.random((donors, 3))
+    targets[:block_rows] = np.nan
+
+    tracemalloc.start()
+    strategy._impute_block(np.arange(block_rows), values, present, targets, np.arange(donors))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # the budget covers the block x donors and donor arrays, only small per receiver vectors come on top
+    assert peak <= 1.02 * strategy.max_memory_mb * 1024 ** 2
+
+def test_streaming_fill_chunked_file(sample_df):
+    '''
+    Testing function to test the streaming imputation over a chunked csv, where text columns holding only
+    nulls in the first chunk (e.g. PoolQC) are read as float and must not be taken as numeric
+    :param sample_df (pd.DataFrame): Testing DataFrame
+    :return: None
+    '''
+    from load_data.load_data_package import Data_Loader_Handler
+
+    expected = sample_df.select_dtypes('number')
+    for method in ('mean', 'median'):
+        batches = Data_Loader_Handler().iter_batches('sample_data/train.csv', chunk_rows=100)
+        handler = Missing_Value_Handler(Fill_Strategy(method)).fit_batches(batches)
+        statistics = handler._strategy.statistics_
+        assert sorted(statistics) == sorted(expected.columns)
+        if method == 'mean':
+            assert np.allclose([statistics[col] for col in expected.columns], expected.mean().to_numpy())
+
+    filled = pd.concat(handler.transform_batches(Data_Loader_Handler().iter_batches('sample_data/train.csv', chunk_rows=100)))
+    assert not filled[expected.columns].isna().any().any()
+    assert filled['PoolQC'].isna().sum() == sample_df['PoolQC'].isna().sum()
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+import pytest
+
+MODULES = ['load_data.load_data_package',
+           'analyze_data.analyze_package',
+           'data_handler.missing_value_fix',
+           'data_handler.merge_low_frequency',
+           'data_handler.data_transformation',
+           'uni_variate_analysis.uni_variate_analysis',
+           'bi_variate.bi_variate_analysis',
+           'multi_variate.multivariate_analysis',
+           'missing_value.missing_value_analysis']
+
+PLOTTING_MODULES = ['matplotlib', 'seaborn', 'fontTools']
+
+def import_in_fresh_interpreter(module: str) -> tuple:
+    '''
+    Import a module in a new interpreter and report the import time and the loaded plotting modules
+    :param module (str): dotted module name
+    :return: (seconds, list of plotting modules loaded by the import)
+    '''
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            f"import {module}\n"
+            "print(time.perf_counter() - start)\n"
+            f"print(','.join(m for m in {PLOTTING_MODULES!r} if m in sys.modules))\n")
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    seconds, loaded = output.splitlines()
+    return float(seconds), [m for m in loaded.split(',') if m]
+
+@pytest.mark.parametrize('module', MODULES)
+def test_no_plotting_import(module):
+    '''
+    Testing function to guard that importing a module does not pull in the plotting stack
+    :param module (str): dotted module name
+    :return: None
+    '''
+    seconds, loaded = import_in_fresh_interpreter(module)
+    print(f'{module} imported in {seconds:.3f}s')
+    assert loaded == []
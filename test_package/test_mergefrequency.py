@@ -26,3 +26,78 @@ def test_handler(sample_df, sample_columns):
         print(new_df[feature].unique())
 
 
+
+def test_vectorized_merge_matches_map(sample_df, sample_columns):
+    '''
+    Testing function to check the vectorized merge against the element-wise mapping
+    '''
+    features = sample_columns['categorical'] + ['MSSubClass']
+    mapping_dict = MergeStrategy.check(sample_df, features)
+    expected = {feature: sample_df[feature].map(lambda x: mapping_dict[feature].get(x, x)) for feature in features}
+
+    new_df = MergeStrategy().handle(sample_df.copy(), features)
+    for feature in features:
+        assert new_df[feature].equals(expected[feature])
+
+    categorical = MergeStrategy.merge_column(sample_df['Neighborhood'].astype('category'),
+                                             list(mapping_dict['Neighborhood']))
+    assert categorical.dtype == 'category'
+    assert categorical.astype(object).equals(expected['Neighborhood'])
+
+def test_fitted_vocabulary(sample_df, sample_columns, tmp_path):
+    '''
+    Testing function to check that a fitted vocabulary merges new batches consistently
+    '''
+    features = sample_columns['categorical']
+    strategy = MergeStrategy().fit(sample_df, features)
+
+    expected = MergeStrategy().handle(sample_df.copy(), features)
+    assert strategy.transform(sample_df)[features].equals(expected[features])
+
+    batch = pd.DataFrame({'Neighborhood': ['NAmes', 'Blueste', 'NewTown', None],
+                          'MSZoning': ['RL', 'RM', 'C (all)', 'RL']})
+    path = str(tmp_path / 'vocabulary.json')
+    strategy.save_vocabulary(path)
+    merged = MergeStrategy.load_vocabulary(path).transform(batch, ['Neighborhood', 'MSZoning'])
+    assert merged['Neighborhood'].to_list()[:3] == ['NAmes', 'SMALL_GROUP', 'SMALL_GROUP']
+    assert pd.isna(merged['Neighborhood'].iloc[3])
+    assert merged['MSZoning'].to_list() == ['RL', 'RM', 'SMALL_GROUP', 'RL']
+
+def test_sketch_counting_is_mergeable():
+    '''
+    Testing function to check that sketch counting finds the same frequent values as exact counting,
+    and that strategies fitted on separate chunks merge into the strategy fitted on all rows
+    '''
+    rng = np.random.default_rng(0)
+    frequent = rng.choice(['A', 'B', 'C', 'D'], size=40_000, p=[0.4, 0.3, 0.2, 0.1])
+    ids = pd.Series(np.where(rng.random(40_000) < 0.5, frequent, rng.integers(0, 20_000, 40_000).astype(str)))
+    df = pd.DataFrame({'user_id': ids})
+
+    exact = MergeStrategy(threshold=4).fit(df, ['user_id'])
+    sketch = MergeStrategy(threshold=4, counting='sketch', epsilon=0.002).fit(df, ['user_id'])
+    assert sorted(sketch.vocabulary_['user_id']) == sorted(exact.vocabulary_['user_id']) == ['A', 'B', 'C', 'D']
+
+    first = MergeStrategy(threshold=4, counting='sketch', epsilon=0.002).partial_fit(df.iloc[:25_000], ['user_id'])
+    second = MergeStrategy(threshold=4, counting='sketch', epsilon=0.002).partial_fit(df.iloc[25_000:], ['user_id'])
+    merged = first.merge(second)
+    assert sorted(merged.vocabulary_['user_id']) == ['A', 'B', 'C', 'D']
+    assert merged.transform(df)['user_id'].equals(exact.transform(df)['user_id'])
+
+    with pytest.raises(ValueError):
+        merged.merge(MergeStrategy(threshold=4, counting='sketch', epsilon=0.01))
+
+def test_sketch_counting_mixed_int_float_chunks():
+    '''
+    Testing function to check that an int chunk and a float chunk (pandas reads a chunk with a missing
+    value as float) count the same values together in sketch mode
+    '''
+    rng = np.random.default_rng(0)
+    values = rng.choice([10, 20, 30], size=20_000, p=[0.6, 0.32, 0.08])
+    first = pd.DataFrame({'code': values[:10_000]})
+    second = pd.DataFrame({'code': np.append(values[10_000:-1], np.nan)})
+    assert first['code'].dtype == 'int64' and second['code'].dtype == 'float64'
+
+    exact = MergeStrategy(threshold=5).partial_fit(first, ['code']).partial_fit(second, ['code'])
+    sketch = MergeStrategy(threshold=5, counting='sketch').partial_fit(first, ['code']).partial_fit(second, ['code'])
+    assert sorted(exact.vocabulary_['code']) == [10, 20, 30]
+    assert sorted(sketch.vocabulary_['code']) == sorted(exact.vocabulary_['code'])
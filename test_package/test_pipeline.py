@@ -0,0 +1,90 @@
+import pandas as pd
+import numpy as np
+import pytest
+from data_handler.pipeline import Pipeline
+from data_handler.data_transformation import LogTransformation
+from data_handler.missing_value_fix import Fill_Strategy, Drop_Strategy, KNN_Strategy
+from data_handler.merge_low_frequency import MergeStrategy
+from analyze_data.analyze_package import DataInspector
+
+@pytest.fixture
+def sample_df():
+    return pd.read_csv('sample_data/train.csv')
+
+@pytest.fixture
+def sample_columns(sample_df):
+    data_inspector = DataInspector()
+    return data_inspector.get_columns(sample_df)
+
+def test_pipeline_matches_sequential_steps(sample_df, sample_columns):
+    '''
+    Testing function to check that the fused pipeline gives the same frame as running the steps one by one
+    '''
+    categorical = sample_columns['categorical']
+    steps = [LogTransformation(['LotFrontage', 'SalePrice']),
+             Fill_Strategy('median'),
+             (MergeStrategy(), categorical),
+             (Fill_Strategy('mode'), categorical)]
+
+    expected = sample_df.copy()
+    expected = steps[0].transform(expected)
+    expected = steps[1].handle(expected)
+    expected = MergeStrategy().handle(expected.copy(), categorical)
+    expected = Fill_Strategy('mode').handle(expected, categorical)
+
+    original = sample_df.copy()
+    pipeline = Pipeline(steps, workers=4)
+    result = pipeline.transform(sample_df)
+
+    pd.testing.assert_frame_equal(result, expected)
+    pd.testing.assert_frame_equal(sample_df, original)
+    assert pipeline.plan() == [('fused', [0, 1, 2, 3])]
+    assert pipeline.report_['step'].to_list() == [0, 1, 2, 3]
+    assert (pipeline.report_['stage'] == 'fused').all()
+
+def test_pipeline_barriers():
+    '''
+    Testing function to check that row changing and multi column steps split the fused stages
+    and run in their place of the chain
+    '''
+    df = pd.DataFrame({'A': [1.0, np.nan, 3.0, 10.0, np.nan, 11.0],
+                       'B': [1.0, np.nan, 1.2, 9.0, 9.5, 9.2],
+                       'C': [1.0, 2.0, 1.1, np.nan, 5.0, 5.2]})
+    pipeline = Pipeline([LogTransformation(['B']), (Drop_Strategy(threshold=2), None),
+                         KNN_Strategy(n_neighbors=1), Fill_Strategy('mean'), LogTransformation(['A'])])
+    result = pipeline.transform(df)
+
+    expected = Drop_Strategy(threshold=2).handle(LogTransformation(['B']).transform(df))
+    imputed = KNN_Strategy(n_neighbors=1).handle(expected)
+    assert imputed.notna().sum().sum() > expected.notna().sum().sum()
+    expected = LogTransformation(['A']).transform(Fill_Strategy('mean').handle(imputed))
+    pd.testing.assert_frame_equal(result, expected)
+
+    # filling before the neighbours would use the column means instead of the nearest rows
+    swapped = Pipeline([LogTransformation(['B']), (Drop_Strategy(threshold=2), None), Fill_Strategy('mean'),
+                        KNN_Strategy(n_neighbors=1), LogTransformation(['A'])]).transform(df)
+    assert not swapped.equals(result)
+
+    assert [kind for kind, _ in pipeline.plan()] == ['fused', 'frame', 'frame', 'fused']
+    assert len(pipeline.report_) == 5
+
+    with pytest.raises(ValueError):
+        Pipeline([DataInspector()])
+
+def test_pipeline_fused_inplace():
+    '''
+    Testing function to check that fused steps honour their inplace flag like running them one by one
+    '''
+    df = pd.DataFrame({'A': [1.0, np.nan, 3.0], 'B': [4.0, 5.0, np.nan]})
+    expected = Fill_Strategy('mean').handle(LogTransformation(['A', 'B']).transform(df))
+
+    result = Pipeline([LogTransformation(['A', 'B'], inplace=True), Fill_Strategy('mean', inplace=True)]).transform(df)
+    assert result is df
+    pd.testing.assert_frame_equal(df, expected)
+
+    df = pd.DataFrame({'A': [1.0, np.nan, 3.0], 'B': [4.0, 5.0, np.nan]})
+    logged = LogTransformation(['A', 'B']).transform(df)
+    result = Pipeline([LogTransformation(['A', 'B'], inplace=True), Fill_Strategy('mean')]).transform(df)
+    assert result is not df
+    pd.testing.assert_frame_equal(df, logged)
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,77 @@
+import pandas as pd
+import numpy as np
+import pytest
+from data_handler.sketches import RunningMoments, QuantileSketch, SpaceSaving, CountMinSketch
+
+@pytest.fixture
+def sample_values():
+    return np.random.default_rng(0).lognormal(size=200_000)
+
+def test_running_moments(sample_values):
+    '''
+    Testing function for RunningMoments, merged chunks should match the exact moments
+    :param sample_values (np.ndarray): Testing values
+    :return: None
+    '''
+    left, right = RunningMoments(), RunningMoments()
+    for chunk in np.array_split(sample_values[:120_000], 7):
+        left.update(chunk)
+    right.update(sample_values[120_000:])
+    moments = left.merge(right)
+
+    assert moments.count == len(sample_values)
+    assert np.isclose(moments.mean, sample_values.mean())
+    assert np.isclose(moments.std(), sample_values.std(ddof=1))
+    assert moments.min == sample_values.min() and moments.max == sample_values.max()
+
+def test_quantile_sketch(sample_values):
+    '''
+    Testing function for QuantileSketch, the rank error should stay small after merging
+    :param sample_values (np.ndarray): Testing values
+    :return: None
+    '''
+    sketches = [QuantileSketch(k=200, seed=seed).update(chunk)
+                for seed, chunk in enumerate(np.array_split(sample_values, 4))]
+    sketch = sketches[0]
+    for other in sketches[1:]:
+        sketch.merge(other)
+
+    assert sketch.count == len(sample_values)
+    assert sum(len(c) for c in sketch.compactors) < 5_000
+    estimates = sketch.quantiles([0.1, 0.25, 0.5, 0.75, 0.9])
+    ranks = np.searchsorted(np.sort(sample_values), estimates) / len(sample_values)
+    assert np.all(np.abs(ranks - [0.1, 0.25, 0.5, 0.75, 0.9]) < 0.02)
+
+def test_space_saving():
+    '''
+    Testing function for SpaceSaving, frequent values should survive a long tail of rare values
+    :return: None
+    '''
+    rng = np.random.default_rng(1)
+    values = np.concatenate([np.repeat(['a', 'b', 'c'], [30_000, 20_000, 10_000]),
+                             rng.integers(0, 50_000, 40_000).astype(str)])
+    rng.shuffle(values)
+
+    left, right = SpaceSaving(capacity=50), SpaceSaving(capacity=50)
+    for chunk in np.array_split(values[:60_000], 6):
+        left.update(chunk)
+    right.update(values[60_000:])
+    summary = left.merge(right)
+
+    assert summary.total == len(values)
+    assert summary.top(3).index.to_list() == ['a', 'b', 'c']
+    assert (summary.top(3) >= [30_000, 20_000, 10_000]).all()
+
+def test_count_min_sketch_bounds():
+    '''
+    Testing function to check that count-min estimates are upper bounds within epsilon of the total
+    '''
+    values = np.random.default_rng(1).zipf(1.5, 50_000)
+    sketch = CountMinSketch(epsilon=0.001, delta=0.01).update(values[:20_000])
+    sketch.merge(CountMinSketch(epsilon=0.001, delta=0.01).update(values[20_000:]))
+
+    exact = pd.Series(values).value_counts()
+    estimates = sketch.estimate(exact.index.to_numpy())
+    assert sketch.total == len(values)
+    assert (estimates >= exact.to_numpy()).all()
+    assert ((estimates - exact.to_numpy()) <= 0.001 * len(values)).mean() > 0.99
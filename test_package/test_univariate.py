@@ -35,4 +35,50 @@ def test_categoricalcunivariate(sample_df, sample_columns):
     analyzer = Uni_Variate_Analyzer(CategoricalUniAnalysis())
     col_dict = sample_columns
     for col in col_dict['categorical'][:5]:
-        analyzer.analyze(sample_df, col)
\ No newline at end of file
+        analyzer.analyze(sample_df, col)
+
+def test_batch_render(sample_df, sample_columns, tmp_path):
+    '''
+    Testing function for Uni_Variate_Analyzer.render(), files are written headless by worker processes
+    :param sample_df: Testing Sample Data
+    :return: None
+    '''
+    import os
+
+    features = sample_columns['numeric'][:4]
+    paths = Uni_Variate_Analyzer(NumericUniAnalysis()).render(sample_df, features, str(tmp_path / 'numeric'), workers=2)
+    assert list(paths) == features
+    for path in paths.values():
+        with open(path, 'rb') as f:
+            assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+    features = sample_columns['categorical'][:2]
+    paths = Uni_Variate_Analyzer(CategoricalUniAnalysis()).render(sample_df, features, str(tmp_path / 'categorical'),
+                                                                  file_format='svg')
+    assert all(path.endswith('.svg') and os.path.getsize(path) > 0 for path in paths.values())
+
+    with pytest.raises(ValueError):
+        Uni_Variate_Analyzer(NumericUniAnalysis()).render(sample_df, features, str(tmp_path / 'wrong'), file_format='jpg')
+
+def test_batch_render_names(tmp_path):
+    '''
+    Testing function for the file names of Uni_Variate_Analyzer.render() and for strategies without draw()
+    :return: None
+    '''
+    import os
+    from uni_variate_analysis.uni_variate_analysis import UniVariateStrategy
+
+    df = pd.DataFrame({'a b': [1.0, 2.0, 3.0], 'a_b': [3.0, 4.0, 4.0], 'a/b': [0.0, 1.0, 1.0]})
+    paths = Uni_Variate_Analyzer(NumericUniAnalysis()).render(df, ['a b', 'a_b', 'a/b', 'a b'], str(tmp_path))
+    assert list(paths) == ['a b', 'a_b', 'a/b']
+    assert len(set(paths.values())) == 3
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in paths.values())
+
+    class AnalyzeOnly(UniVariateStrategy):
+        def analyze(self, df, feature):
+            return None
+
+    analyzer = Uni_Variate_Analyzer(AnalyzeOnly())
+    analyzer.analyze(df, 'a b')
+    with pytest.raises(ValueError):
+        analyzer.render(df, ['a b'], str(tmp_path / 'analyze_only'))
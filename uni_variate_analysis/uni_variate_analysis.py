@@ -1,8 +1,10 @@
-import matplotlib.pyplot as plt
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
-import seaborn as sns
 
 class UniVariateStrategy(ABC):
     '''
@@ -20,6 +22,17 @@ class UniVariateStrategy(ABC):
 
         pass
 
+    def draw(self, df: pd.DataFrame, feature: str, ax) -> None:
+        '''
+        Draw the graph of the feature on the given matplotlib axes, used by the batch rendering.
+        Strategies implementing only analyze() keep working, they just can not be rendered to files
+        :param df (pd.DataFrame): target dataframe for analysis
+        :param feature (str) : Target feature in target dataframe
+        :param ax (matplotlib.axes.Axes): axes to draw on
+        :return: None
+        '''
+        raise NotImplementedError(f"{type(self).__name__} does not implement draw(), it can not be rendered to files")
+
 class NumericUniAnalysis(UniVariateStrategy):
 
     '''
@@ -35,13 +48,27 @@ class NumericUniAnalysis(UniVariateStrategy):
         '''
 
         print(f"Analyzing feature {feature} .........")
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(10,6))
-        sns.histplot(df[feature], kde= True, bins = 50)
-        plt.title(f'Histogram for feature {feature}')
-        plt.xlabel(f'{feature}')
-        plt.ylabel('Frequency')
+        self.draw(df, feature, plt.gca())
         plt.show()
 
+    def draw(self, df: pd.DataFrame, feature: str, ax) -> None:
+        '''
+        Draw the histogram of the feature on the given matplotlib axes
+        :param df (pd.DataFrame): target dataframe for analysis
+        :param feature (str) : Target feature in target dataframe
+        :param ax (matplotlib.axes.Axes): axes to draw on
+        :return: None
+        '''
+        import seaborn as sns
+
+        sns.histplot(df[feature], kde= True, bins = 50, ax = ax)
+        ax.set_title(f'Histogram for feature {feature}')
+        ax.set_xlabel(f'{feature}')
+        ax.set_ylabel('Frequency')
+
 class CategoricalUniAnalysis(UniVariateStrategy):
 
     '''
@@ -57,17 +84,47 @@ class CategoricalUniAnalysis(UniVariateStrategy):
         '''
 
         print(f"Analyzing the categorical feature {feature}")
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(10,6))
+        self.draw(df, feature, plt.gca())
+        plt.show()
+
+    def draw(self, df: pd.DataFrame, feature: str, ax) -> None:
+        '''
+        Draw the count plot of the feature on the given matplotlib axes
+        :param df (pd.DataFrame): target dataframe for analysis
+        :param feature (str) : Target feature in target dataframe
+        :param ax (matplotlib.axes.Axes): axes to draw on
+        :return: None
+        '''
+        import seaborn as sns
 
         # new_df = df.groupby(feature).size().reset_index(name = 'cnt').sort_values('cnt', ascending= False)
         # sns.barplot(x=feature, y = 'cnt', data = new_df, palette= 'viridis')
 
         sorted_order = df[feature].value_counts().index
-        sns.countplot(x = feature, data = df, palette= 'muted', order = sorted_order)
-        plt.title(f'Count Plot for feature {feature}')
-        plt.xlabel(f'{feature}')
-        plt.ylabel('Count')
-        plt.show()
+        sns.countplot(x = feature, data = df, palette= 'muted', order = sorted_order, ax = ax)
+        ax.set_title(f'Count Plot for feature {feature}')
+        ax.set_xlabel(f'{feature}')
+        ax.set_ylabel('Count')
+
+def render_feature(strategy: UniVariateStrategy, column: pd.Series, path: str, dpi: int = 100) -> str:
+    '''
+    Render the graph of one feature to a file without pyplot, so no interactive backend or global
+    figure state is involved and it can run in worker processes
+    :param strategy (UniVariateStrategy): Strategy drawing the graph
+    :param column (pd.Series): Target feature, named after the feature
+    :param path (str): Output file, the format follows the extension
+    :param dpi (int): Resolution of raster formats
+    :return (str): path of the rendered file
+    '''
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(10,6))
+    strategy.draw(column.to_frame(), column.name, figure.subplots())
+    figure.savefig(path, dpi = dpi)
+    return path
 
 class Uni_Variate_Analyzer():
     '''
@@ -105,4 +162,42 @@ class Uni_Variate_Analyzer():
                              "NumericUniAnalysis() or CategoricalUniAnalysis() /n"
                              "you can reset the strategy using .set_strategy() /n")
 
+    def render(self, df: pd.DataFrame, features: list, output_dir: str, file_format: str = 'png',
+               workers: int = None, dpi: int = 100) -> dict:
+        '''
+        Render the graphs of many features to files, in parallel worker processes. Only the column of
+        each feature is sent to the workers
+        :param df (pd.DataFrame): target dataframe for analysis
+        :param features (list[str]) : Target features in target dataframe
+        :param output_dir (str): Directory of the rendered files, created when missing
+        :param file_format (str): 'png' or 'svg'
+        :param workers (int): Number of worker processes, None renders in the current process
+        :param dpi (int): Resolution of the png files
+        :return (dict): feature to file path, in the order of features, repeated features are rendered once
+        '''
+        if file_format not in ('png', 'svg'):
+            raise ValueError("file_format should be 'png' or 'svg'")
+        os.makedirs(output_dir, exist_ok = True)
+        features = list(dict.fromkeys(features))
+        paths, used = [], set()
+        for position, feature in enumerate(features):
+            # cleaned names can collide, e.g. 'a b' and 'a_b', the later feature gets its position as suffix
+            base = name = re.sub(r'[^\w.-]', '_', str(feature))
+            suffix = position
+            while name.lower() in used:
+                name, suffix = f'{base}_{suffix}', suffix + 1
+            used.add(name.lower())
+            paths.append(os.path.join(output_dir, f'{name}.{file_format}'))
+        tasks = [(self._strategy, df[feature], path, dpi) for feature, path in zip(features, paths)]
 
+        try:
+            if workers and workers > 1 and len(tasks) > 1:
+                with ProcessPoolExecutor(max_workers = workers) as pool:
+                    rendered = list(pool.map(render_feature, *zip(*tasks)))
+            else:
+                rendered = [render_feature(*task) for task in tasks]
+        except Exception as e:
+            raise ValueError(f"Can't render the features, check if check to the correct strategy: {e} /n"
+                             "NumericUniAnalysis() or CategoricalUniAnalysis() /n"
+                             "you can reset the strategy using .set_strategy() /n")
+        return dict(zip(features, rendered))